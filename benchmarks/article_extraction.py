@@ -0,0 +1,71 @@
+"""Benchmark PokeBattler article extraction against saved archive pages.
+
+Compares a full ``html.parser`` tree with repeated lookups, as the cog used
+to parse, against ``extract_articles``. Run from the repository root:
+
+    python benchmarks/article_extraction.py [--repeat 20] [--scale 1]
+
+``--scale`` repeats the page body to simulate larger archive pages.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+sys.path.insert(0, ROOT_DIR)
+
+from ehrenbot.utils.articles import PARSER, extract_articles  # noqa: E402
+
+
+def full_tree(html: str) -> list[tuple[str, str, str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    articles = []
+    for article in soup.find_all("article"):
+        title = article.find("h2").text.strip() if article.find("h2") else "No title"
+        image = article.find("img")["src"] if article.find("img") else "No image"
+        url = article.find("a")["href"] if article.find("a") else "No URL"
+        articles.append((title, url, image))
+    return articles
+
+
+def strained(html: str) -> list[tuple[str, str, str]]:
+    return [
+        (article.title, article.url, article.image)
+        for article in extract_articles(html, 0.0)
+    ]
+
+
+def scale_page(html: str, scale: int) -> str:
+    head, _, rest = html.partition("<body")
+    body, _, tail = rest.partition("</body>")
+    return head + "<body" + body * scale + "</body>" + tail
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"extract_articles parser: {PARSER}")
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as file:
+            html = scale_page(file.read(), args.scale)
+        assert full_tree(html) == strained(html), f"{name}: results differ"
+        print(f"{name} ({len(html) / 1024:.0f} KiB, {len(strained(html))} articles)")
+        for label, func in (("full tree", full_tree), ("strained", strained)):
+            seconds = min(
+                timeit.repeat(lambda: func(html), number=1, repeat=args.repeat)
+            )
+            print(f"  {label:<10} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # pylint: disable=invalid-name
+import asyncio
 import logging
 from datetime import time, timezone
 from logging import handlers
@@ -10,17 +11,36 @@ from discord import Activity, ActivityType, DiscordException, Intents
 from discord.ext import commands
 from pymongo import MongoClient
 
+from ehrenbot.utils.bungie import BungieClient, ResponseCache, TokenBucket
+from ehrenbot.utils.database import AsyncDatabase
+from ehrenbot.utils.indexes import ensure_indexes, report_collection_scans
+from ehrenbot.utils.managed_messages import ManagedMessages
+from ehrenbot.utils.metrics import Metrics, render_metrics
+from ehrenbot.utils.mongo_monitoring import CommandMonitor
+from ehrenbot.utils.sequences import Sequence
+from ehrenbot.utils.service_account import ServiceAccount
+from ehrenbot.utils.subscriptions import SHADER_NOTIFICATIONS, SubscriptionStore
+from ehrenbot.utils.tokens import TokenRefreshScheduler, token_expires_at
 from settings import (
     BUNGIE_API_KEY,
     BUNGIE_CLIENT_ID,
     BUNGIE_CLIENT_SECRET,
+    BUNGIE_MAINTENANCE_PROBE_INTERVAL,
+    BUNGIE_MAX_RETRIES,
+    BUNGIE_RATE_BURST,
+    BUNGIE_RATE_LIMIT,
     DEBUG,
     MONGODB_PREFIX,
     MONGODB_HOST,
     MONGODB_OPTIONS,
     MONGODB_PASS,
+    MONGODB_SLOW_QUERY_MS,
     MONGODB_USER,
+    MONGODB_WORKERS,
+    OAUTH_STATE_TTL,
     REDIRECT_URI,
+    TOKEN_REFRESH_CONCURRENCY,
+    TOKEN_REFRESH_LEAD_TIME,
     WEB_SERVER_PORT,
 )
 
@@ -52,15 +72,37 @@ class Ehrenbot(commands.Bot):
         self.file_handler = file_handler
         self.stream_handler = stream_handler
         self.logger = logger
+        self.metrics = Metrics()
+        self._lag_monitor: asyncio.Task = None
         # MongoDB
         conn = f"{MONGODB_PREFIX}://{MONGODB_USER}:{MONGODB_PASS}@{MONGODB_HOST}/?{MONGODB_OPTIONS}"
-        self.mongo_client = MongoClient(conn)
-        self.database = (
-            self.mongo_client["ehrenbot"] if not DEBUG else self.mongo_client["test"]
+        self.command_monitor = CommandMonitor(logger, MONGODB_SLOW_QUERY_MS)
+        self.mongo_client = MongoClient(conn, event_listeners=[self.command_monitor])
+        self.database = AsyncDatabase(
+            self.mongo_client["ehrenbot"] if not DEBUG else self.mongo_client["test"],
+            MONGODB_WORKERS,
         )
-        self.destiny_client = DestinyClient(
-            BUNGIE_API_KEY, BUNGIE_CLIENT_ID, BUNGIE_CLIENT_SECRET, REDIRECT_URI
+        self.database_ready = False
+        self.subscriptions = SubscriptionStore(self.database, self.logger)
+        self.ticket_ids = Sequence(
+            self.database, "ticket_id", "destiny_tickets", "ticket_id"
         )
+        self.managed_messages = ManagedMessages(self.database, self.logger)
+        self.destiny_client = BungieClient(
+            DestinyClient(
+                BUNGIE_API_KEY, BUNGIE_CLIENT_ID, BUNGIE_CLIENT_SECRET, REDIRECT_URI
+            ),
+            ResponseCache(),
+            TokenBucket(BUNGIE_RATE_LIMIT, BUNGIE_RATE_BURST),
+            logger,
+            max_retries=BUNGIE_MAX_RETRIES,
+            probe_interval=BUNGIE_MAINTENANCE_PROBE_INTERVAL,
+        )
+        self.token_scheduler = TokenRefreshScheduler(
+            self, logger, TOKEN_REFRESH_LEAD_TIME, TOKEN_REFRESH_CONCURRENCY
+        )
+        # OAuth states waiting for their callback, resolved by handle_request
+        self.pending_registrations: dict[str, asyncio.Future] = {}
 
         # Misc
         self.DEBUG = DEBUG
@@ -75,6 +117,7 @@ class Ehrenbot(commands.Bot):
             self.destiny_invite_code = "tHQWSPuFVW"
             self.pogo_invite_code = "s32JhvYqaC"
         self.ADMIN_DISCORD_ID = 279725513323315200
+        self.service_account = ServiceAccount(self.database, self.ADMIN_DISCORD_ID)
         self.BUNGIE_BASE_URL = "https://www.bungie.net/"
         self.RESET_TIME = time(
             hour=17, minute=0, second=0, microsecond=0, tzinfo=timezone.utc
@@ -86,8 +129,21 @@ class Ehrenbot(commands.Bot):
         print(self.user.name)
         print("From Ehrenmann to Ehrenmänner")
         print("------")
-        print("Starting web server...")
-        self.loop.create_task(self.web_server())
+        if self._lag_monitor is None:
+            self._lag_monitor = self.loop.create_task(self.metrics.monitor_loop_lag())
+            print("Starting web server...")
+            self.loop.create_task(self.web_server())
+        if not self.database_ready:
+            try:
+                await ensure_indexes(self.database, self.logger, OAUTH_STATE_TTL)
+                await report_collection_scans(self.database, self.logger)
+                await self.subscriptions.import_csv(
+                    SHADER_NOTIFICATIONS, "data/notify-shaders.csv"
+                )
+                self.database_ready = True
+            except Exception:
+                # Retried on the next ready event
+                self.logger.exception("Failed to set up the database")
 
     async def on_application_command_error(
         self, ctx: commands.Context, error: DiscordException
@@ -101,13 +157,19 @@ class Ehrenbot(commands.Bot):
         else:
             raise error  # Here we raise other errors to ensure they aren't ignored
 
+    def expect_registration(self, state: str) -> asyncio.Future:
+        """Return a future that resolves with the token entry for an OAuth state."""
+        future = self.loop.create_future()
+        self.pending_registrations[state] = future
+        return future
+
     async def handle_request(self, request: web.Request) -> web.Response:
         """Handle a request to the web server."""
 
         try:
             code = request.query["code"]
             state = request.query["state"]
-            db_state = self.database["states"].find_one({"state": state})
+            db_state = await self.database["states"].find_one({"state": state})
             print(f"Code: {code}, State: {state}, DB State: {db_state}")
             if not db_state:
                 return web.Response(text="Invalid state.")
@@ -133,11 +195,23 @@ class Ehrenbot(commands.Bot):
             "discord_id": discord_id,
             "membership_id": token["membership_id"],
             "token": token,
+            "expires_at": token_expires_at(token),
         }
-        self.database["destiny_tokens"].insert_one(entry)
+        # One token per user, registering again replaces the old token
+        await self.database["destiny_tokens"].replace_one(
+            {"discord_id": discord_id}, entry, upsert=True
+        )
+        self.token_scheduler.schedule(discord_id, entry["expires_at"])
+        if discord_id == self.service_account.discord_id:
+            self.service_account.update_token(token)
 
         # Remove state form mapped_states
-        self.database["states"].delete_one({"state": state})
+        await self.database["states"].delete_one({"state": state})
+
+        # Wake up the /register command waiting for this state
+        future = self.pending_registrations.pop(state, None)
+        if future and not future.done():
+            future.set_result(entry)
 
         # Serve HTML with JavaScript to close the tab
         html_content = """
@@ -159,10 +233,35 @@ class Ehrenbot(commands.Bot):
 
         return web.Response(content_type="text/html", text=html_content)
 
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Serve metrics in the Prometheus text format."""
+        return web.Response(text=render_metrics(self), content_type="text/plain")
+
+    async def handle_healthz(self, request: web.Request) -> web.Response:
+        """Report readiness: connected to Discord and MongoDB reachable."""
+        checks = {
+            "discord": self.is_ready() and not self.is_closed(),
+            "database": self.database_ready,
+        }
+        try:
+            await asyncio.wait_for(self.database.command("ping"), timeout=2)
+        except Exception:
+            checks["database"] = False
+        ready = all(checks.values())
+        body = {
+            "ready": ready,
+            "checks": checks,
+            "bungie_maintenance": self.destiny_client.breaker.is_open,
+            "event_loop_lag": self.metrics.loop_lag,
+        }
+        return web.json_response(body, status=200 if ready else 503)
+
     async def web_server(self) -> None:
         """Start the web server."""
         app = web.Application()
         app.router.add_get("/", self.handle_request)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/healthz", self.handle_healthz)
         runner = web.AppRunner(app)
         await runner.setup()
         site = web.TCPSite(runner, "0.0.0.0", WEB_SERVER_PORT)
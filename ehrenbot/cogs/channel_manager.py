@@ -1,9 +1,14 @@
+import asyncio
 import logging
 
 import discord
 from discord.ext import commands, tasks
 
 from ehrenbot.bot import Ehrenbot
+from ehrenbot.utils.metrics import timed_task
+
+# Seconds changes are batched for before the temp channels are written
+PERSIST_DELAY = 5
 
 
 class ChannelManager(commands.Cog):
@@ -13,17 +18,42 @@ class ChannelManager(commands.Cog):
         self.logger.setLevel(logging.DEBUG)
         self.logger.addHandler(self.bot.file_handler)
         self.logger.addHandler(self.bot.stream_handler)
-        temp_channels = self.bot.database["temp_channels"].find_one(
-            {"channel_type": "voice_channels"}
-        )
-        if temp_channels:
-            self.temp_channels = temp_channels["channels"]
-        else:
-            self.temp_channels = []
+        self.temp_channels: set[int] = set()
+        self._persisted: set[int] = set()
+        self._persist_task: asyncio.Task = None
         self.delete_temp_channels.start()
 
     def cog_unload(self) -> None:
         self.delete_temp_channels.cancel()
+        if self._persist_task and not self._persist_task.done():
+            self._persist_task.cancel()
+            self.bot.loop.create_task(self.persist())
+
+    def schedule_persist(self) -> None:
+        """Write the temp channels PERSIST_DELAY after the first unsaved change.
+
+        Changes made meanwhile are batched into that write, so the stored
+        set lags at most PERSIST_DELAY behind even while channels keep
+        changing."""
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = self.bot.loop.create_task(self._persist_later())
+
+    async def _persist_later(self) -> None:
+        # Changes made during a write are picked up by the next round
+        while self.temp_channels != self._persisted:
+            await asyncio.sleep(PERSIST_DELAY)
+            await self.persist()
+
+    async def persist(self) -> None:
+        if self.temp_channels == self._persisted:
+            return
+        snapshot = set(self.temp_channels)
+        await self.bot.database["temp_channels"].update_one(
+            {"channel_type": "voice_channels"},
+            {"$set": {"channels": sorted(snapshot)}},
+            upsert=True,
+        )
+        self._persisted = snapshot
 
     @commands.Cog.listener()
     async def on_voice_state_update(
@@ -33,6 +63,9 @@ class ChannelManager(commands.Cog):
         after: discord.VoiceState,
     ):
         """Manage temporary voice channels"""
+        # Mute, deafen, stream and similar updates do not move the member
+        if before.channel == after.channel:
+            return
         # Create a temporary channel if the user joins a channel and the channel starts with "New"
         if after.channel:
             if after.channel.name.lower().startswith("New".lower()):
@@ -42,35 +75,44 @@ class ChannelManager(commands.Cog):
                         name=f"{member.display_name}'s {channel_name}"
                     )
                     await member.move_to(temp_channel)
-                    self.temp_channels.append(temp_channel.id)
+                    self.temp_channels.add(temp_channel.id)
+                    self.schedule_persist()
 
         # Delete the temporary channel if the user leaves the channel
         if before.channel:
             if before.channel.id in self.temp_channels:
                 if len(before.channel.members) == 0:
                     await before.channel.delete()
-                    self.temp_channels.remove(before.channel.id)
+                    self.temp_channels.discard(before.channel.id)
+                    self.schedule_persist()
 
-        self.bot.database["temp_channels"].update_one(
-            {"channel_type": "voice_channels"},
-            {"$set": {"channels": self.temp_channels}},
-            upsert=True,
-        )
+    async def _cleanup(self, channel_id: int) -> None:
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            # Deleted while the bot was offline
+            self.temp_channels.discard(channel_id)
+        elif len(channel.members) == 0:
+            await channel.delete()
+            self.temp_channels.discard(channel_id)
 
     @tasks.loop(count=1)
+    @timed_task
     async def delete_temp_channels(self):
-        for channel_id in self.temp_channels:
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                if len(channel.members) == 0:
-                    await channel.delete()
-                    self.temp_channels.remove(channel_id)
-
-        self.bot.database["temp_channels"].update_one(
-            {"channel_type": "voice_channels"},
-            {"$set": {"channels": self.temp_channels}},
-            upsert=True,
+        temp_channels = await self.bot.database["temp_channels"].find_one(
+            {"channel_type": "voice_channels"}
+        )
+        if temp_channels:
+            self._persisted = set(temp_channels["channels"])
+            self.temp_channels |= self._persisted
+
+        results = await asyncio.gather(
+            *(self._cleanup(channel_id) for channel_id in list(self.temp_channels)),
+            return_exceptions=True,
         )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("Failed to clean up temp channel: %s", result)
+        await self.persist()
 
     @delete_temp_channels.before_loop
     async def before_delete_temp_channels(self):
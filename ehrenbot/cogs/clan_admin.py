@@ -22,20 +22,20 @@ class ClanAdmin(commands.Cog):
     @commands.has_role("Clan Admin")
     async def kick(self, ctx: discord.ApplicationContext, member: discord.Member):
         member_collection = self.bot.database["members"]
-        member_info = member_collection.find_one({"discord_id": member.id})
+        member_info = await member_collection.find_one({"discord_id": member.id})
         if not member_info:
             await ctx.send(
                 f"{member.name} you wanted to kick was not found. Please contact an admin."
             )
             return
-        admin_info = member_collection.find_one({"discord_id": ctx.author.id})
+        admin_info = await member_collection.find_one({"discord_id": ctx.author.id})
         if not admin_info:
             await ctx.send(
                 "Your Discord ID was not found in the database. Please contact an admin."
             )
             return
         token_collection = self.bot.database["destiny_tokens"]
-        admin_token = token_collection.find_one({"discord_id": ctx.author.id})
+        admin_token = await token_collection.find_one({"discord_id": ctx.author.id})
         if not admin_token:
             await ctx.send(
                 "Your Bungie.Net token was not found. Please contact an admin."
@@ -1,4 +1,3 @@
-import csv
 import logging
 from typing import Dict
 
@@ -6,6 +5,7 @@ import discord
 from discord.ext import commands, tasks
 
 from ehrenbot.bot import Ehrenbot
+from ehrenbot.utils.metrics import timed_task
 
 
 class MemberManager(commands.Cog):
@@ -19,6 +19,7 @@ class MemberManager(commands.Cog):
         self.get_invites.start()
 
     @tasks.loop(seconds=60, count=1)
+    @timed_task
     async def get_invites(self):
         for guild in self.bot.guilds:
             self.invites[guild.id] = await guild.invites()
@@ -92,15 +93,18 @@ class MemberManager(commands.Cog):
             message: discord.Message = await member_hall.send(embed=embed)
             message_id = message.id
             member_collection = self.bot.database["members"]
-            member_collection.insert_one(
+            await member_collection.update_one(
+                {"discord_id": member.id},
                 {
-                    "discord_id": member.id,
-                    "message_id": message_id,
-                    "channel_id": member_hall.id,
-                    "joined_at": member.joined_at,
-                    "invite_url": invite_code,
-                    "is_bot": member.bot,
-                }
+                    "$set": {
+                        "message_id": message_id,
+                        "channel_id": member_hall.id,
+                        "joined_at": member.joined_at,
+                        "invite_url": invite_code,
+                        "is_bot": member.bot,
+                    }
+                },
+                upsert=True,
             )
         await ctx.respond("Done!")
 
@@ -151,15 +155,18 @@ class MemberManager(commands.Cog):
         message: discord.Message = await member_hall.send(embed=embed)
         message_id = message.id
         member_collection = self.bot.database["members"]
-        member_collection.insert_one(
+        await member_collection.update_one(
+            {"discord_id": member.id},
             {
-                "discord_id": member.id,
-                "message_id": message_id,
-                "channel_id": member_hall.id,
-                "joined_at": member.joined_at,
-                "invite_url": invite_code,
-                "is_bot": member.bot,
-            }
+                "$set": {
+                    "message_id": message_id,
+                    "channel_id": member_hall.id,
+                    "joined_at": member.joined_at,
+                    "invite_url": invite_code,
+                    "is_bot": member.bot,
+                }
+            },
+            upsert=True,
         )
 
         # Give member the correct role
@@ -178,24 +185,19 @@ class MemberManager(commands.Cog):
         print(f"{member.display_name} left the server.")
         self.logger.info("Member %s left the server.", member.display_name)
         member_collection = self.bot.database["members"]
-        entries = member_collection.find({"discord_id": member.id})
+        entry = await member_collection.find_one({"discord_id": member.id})
         # Remove member to member hall and database
         member_hall = discord.utils.get(member.guild.channels, name="member-hall")
-        for entry in entries:
-            message_id = entry["message_id"]
-            message = await member_hall.fetch_message(message_id)
-            await message.delete()
-        member_collection.delete_many({"discord_id": member.id})
-        # Remove member from notify-shaders.csv
-        with open("data/notify-shaders.csv", "r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            ids = [int(row[0]) for row in reader]
-        if member.id in ids:
-            ids.remove(member.id)
-        with open("data/notify-shaders.csv", "w", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            for _id in ids:
-                writer.writerow([_id])
+        if entry:
+            try:
+                await member_hall.get_partial_message(entry["message_id"]).delete()
+            except discord.NotFound:
+                pass
+            await member_collection.delete_one({"discord_id": member.id})
+        # Remove member from all notification subscriptions
+        await self.bot.subscriptions.unsubscribe_all(member.id)
+        # Stop refreshing the Bungie token of the member
+        self.bot.token_scheduler.unschedule(member.id)
 
 
 def setup(bot) -> None:
@@ -5,7 +5,27 @@ import discord
 from discord.ext import commands
 
 from ehrenbot.bot import Ehrenbot
-from ehrenbot.utils.registration import setup_profile, update_profile
+from ehrenbot.utils.registration import (
+    refresh_profiles,
+    setup_profile,
+    update_profile,
+)
+
+# Discord rejects messages longer than this
+MESSAGE_LIMIT = 2000
+
+
+def _join_lines(lines: list[str]) -> str:
+    """Join lines up to the message limit and note how many were cut."""
+    kept = []
+    length = 0
+    for line in lines:
+        # Keep room for the note about the cut lines
+        if length + len(line) + 1 > MESSAGE_LIMIT - 20:
+            return "\n".join(kept + [f"... {len(lines) - len(kept)} more"])
+        kept.append(line)
+        length += len(line) + 1
+    return "\n".join(kept)
 
 
 class Owner(commands.Cog):
@@ -56,11 +76,11 @@ class Owner(commands.Cog):
         await ctx.defer()
         profiles_collection = self.bot.database["destiny_profiles"]
         members_collection = self.bot.database["members"]
-        for entry in profiles_collection.find():
+        async for entry in profiles_collection.find():
             discord_id = entry["discord_id"]
             destiny_profile = entry["profile"]
             membership_id = entry["membershipId"]
-            members_collection.update_one(
+            await members_collection.update_one(
                 {"discord_id": discord_id},
                 {
                     "$set": {
@@ -82,7 +102,7 @@ class Owner(commands.Cog):
         """Update member hall"""
         await ctx.defer()
         members_collection = self.bot.database["members"]
-        for entry in members_collection.find():
+        async for entry in members_collection.find():
             if "destiny_profile" in entry:
                 message_id = entry["message_id"]
                 channel: discord.TextChannel = ctx.guild.get_channel(
@@ -104,21 +124,13 @@ class Owner(commands.Cog):
         """Update profile"""
         await ctx.defer()
         if discord_id is None:
-            members_collection = self.bot.database["members"]
-            token_collection = self.bot.database["destiny_tokens"]
-            for token in token_collection.find():
-                entry = members_collection.find_one({"discord_id": token["discord_id"]})
-                if entry:
-                    await setup_profile(
-                        self.bot, token["discord_id"], token["membership_id"]
-                    )
-                    await update_profile(self.bot, entry["discord_id"])
+            await refresh_profiles(self.bot, self.logger)
         else:
             discord_id = int(discord_id)
             members_collection = self.bot.database["members"]
             token_collection = self.bot.database["destiny_tokens"]
-            token = token_collection.find_one({"discord_id": discord_id})
-            entry = members_collection.find_one({"discord_id": discord_id})
+            token = await token_collection.find_one({"discord_id": discord_id})
+            entry = await members_collection.find_one({"discord_id": discord_id})
             if entry:
                 await setup_profile(
                     self.bot, token["discord_id"], token["token"]["membership_id"]
@@ -129,6 +141,55 @@ class Owner(commands.Cog):
                 return
         await ctx.respond("Updated profile/s", delete_after=5)
 
+    @owner.command(name="bungie_cache", description="Show Bungie API cache stats.")
+    @commands.is_owner()
+    async def bungie_cache(self, ctx: discord.ApplicationContext):
+        """Show Bungie API cache hit rates and deduplicated calls"""
+        client = self.bot.destiny_client
+        lines = [
+            f"`{endpoint}`: {stat['hits']}/{stat['hits'] + stat['misses']} "
+            f"({stat['hit_rate']:.0%})"
+            for endpoint, stat in client.cache.stats().items()
+        ]
+        lines += [
+            f"`{endpoint}`: {stat['deduplicated']} deduplicated, "
+            f"{stat['calls']} sent"
+            for endpoint, stat in client.single_flight.stats().items()
+            if stat["deduplicated"]
+        ]
+        await ctx.respond("\n".join(lines) or "No cached calls yet.", ephemeral=True)
+
+    @owner.command(name="db_latency", description="Show MongoDB call latencies.")
+    @commands.is_owner()
+    async def db_latency(self, ctx: discord.ApplicationContext):
+        """Show MongoDB calls, mean and max latency per collection and operation"""
+        lines = [
+            f"`{operation}`: {stat['calls']} calls, {stat['mean_ms']:.1f}ms mean, "
+            f"{stat['max_ms']:.1f}ms max"
+            + (f", {stat['errors']} errors" if stat["errors"] else "")
+            for operation, stat in self.bot.database.stats().items()
+        ]
+        await ctx.respond(
+            _join_lines(lines) or "No database calls yet.", ephemeral=True
+        )
+
+    @owner.command(
+        name="db_top", description="Show the most expensive MongoDB commands."
+    )
+    @commands.is_owner()
+    async def db_top(self, ctx: discord.ApplicationContext, limit: int = 10):
+        """Show the operations with the most total server time"""
+        lines = [
+            f"`{collection}.{operation}`: {stat.latency.count}x, "
+            f"{stat.latency.sum * 1000:.0f}ms total, "
+            f"p95 <= {stat.latency.quantile(0.95) * 1000:.0f}ms, "
+            f"max {stat.latency.max * 1000:.0f}ms, {stat.documents} docs"
+            for (collection, operation), stat in self.bot.command_monitor.top(limit)
+        ]
+        await ctx.respond(
+            _join_lines(lines) or "No commands recorded yet.", ephemeral=True
+        )
+
 
 def setup(bot) -> None:
     bot.add_cog(Owner(bot))
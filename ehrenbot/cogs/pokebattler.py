@@ -1,16 +1,21 @@
+import asyncio
 import logging
 import aiohttp
 import discord
-from datetime import datetime, time
-
-from bs4 import BeautifulSoup
+from datetime import datetime, time, timedelta
 
 from discord.ext import commands, tasks
 
 from ehrenbot.types import PokeBattlerArticle
 from ehrenbot.embeds.pokebattler_article import PokeBattlerArticleEmbed
+from ehrenbot.utils.articles import parse_articles
+from ehrenbot.utils.fanout import fan_out
+from ehrenbot.utils.metrics import timed_task
+from ehrenbot.utils.seen_articles import SeenArticles
+from settings import CHANNEL_FANOUT_CONCURRENCY, POKEBATTLER_BACKFILL_DAYS
 
 every_hour = [time(hour=x, minute=0) for x in range(24)]
+ARCHIVE_URL = "https://articles.pokebattler.com/{day:%Y/%m/%d}/"
 
 
 class PokeBattler(commands.Cog):
@@ -22,6 +27,9 @@ class PokeBattler(commands.Cog):
         self.logger.addHandler(self.bot.stream_handler)
 
         self.articles: list[PokeBattlerArticle] = []
+        # Archive url to ETag, Last-Modified and articles of its last response
+        self.pages: dict[str, tuple[str, str, list[PokeBattlerArticle]]] = {}
+        self.seen = SeenArticles(self.bot.database)
         self.do_fetch_articles.start()
 
     def cog_unload(self):
@@ -32,6 +40,7 @@ class PokeBattler(commands.Cog):
         await self.fetch_articles()
 
     @tasks.loop(time=every_hour)
+    @timed_task
     async def do_fetch_articles(self):
         await self.fetch_articles()
 
@@ -41,44 +50,91 @@ class PokeBattler(commands.Cog):
 
     async def fetch_articles(self):
         self.logger.info("Fetching PokeBattler articles")
-        today = datetime.now()
-        month = today.month if today.month > 9 else f"0{today.month}"
-        day = today.day if today.day > 9 else f"0{today.day}"
-        url = f"https://articles.pokebattler.com/{today.year}/{month}/{day}/"
-        self.articles = []
+        now = datetime.now()
+        # Oldest day first, so backfilled articles are posted in order
+        days = [
+            now - timedelta(days=offset)
+            for offset in reversed(range(POKEBATTLER_BACKFILL_DAYS))
+        ]
         async with aiohttp.ClientSession() as session:
-            response = await session.get(url)
-            if response.status == 200:
-                html_content = await response.text()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                articles = soup.find_all('article')  # Adjust based on actual site structure
-
-                for article in articles:
-                    title = article.find('h2').text.strip() if article.find('h2') else 'No title'
-                    image = article.find('img')['src'] if article.find('img') else 'No image'
-                    article_url = article.find('a')['href'] if article.find('a') else 'No URL'
-                    self.articles.append(PokeBattlerArticle(title=title, url=article_url, image=image, published=datetime.timestamp(today)))
-            elif response.status == 404:
-                self.logger.debug(f"No articles found for {today.year}/{month}/{day}")
-            else:
-                self.logger.error(f"Failed to fetch PokeBattler articles: {response.status}")
+            pages = await asyncio.gather(
+                *(self.fetch_page(session, day) for day in days),
+                return_exceptions=True,
+            )
+        articles: dict[str, PokeBattlerArticle] = {}
+        for day, page in zip(days, pages):
+            if isinstance(page, Exception):
+                self.logger.error(
+                    f"Failed to fetch PokeBattler articles for {day:%Y/%m/%d}: {page}"
+                )
+                continue
+            # Archive pages list the newest article first
+            for article in reversed(page):
+                articles.setdefault(article.url, article)
+        self.articles = list(articles.values())
+        # Forget the validators of days that left the window
+        urls = {ARCHIVE_URL.format(day=day) for day in days}
+        self.pages = {url: page for url, page in self.pages.items() if url in urls}
 
         await self.send_articles()
 
+    async def fetch_page(
+        self, session: aiohttp.ClientSession, day: datetime
+    ) -> list[PokeBattlerArticle]:
+        """Fetch the articles of a day archive, reusing them if not modified."""
+        url = ARCHIVE_URL.format(day=day)
+        cached = self.pages.get(url)
+        headers = {}
+        if cached and cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached and cached[1]:
+            headers["If-Modified-Since"] = cached[1]
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return cached[2]
+            if response.status == 200:
+                articles = await parse_articles(
+                    await response.text(), datetime.timestamp(day)
+                )
+                self.pages[url] = (
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    articles,
+                )
+                return articles
+            if response.status == 404:
+                self.logger.debug(f"No articles found for {day:%Y/%m/%d}")
+                return []
+            self.logger.error(
+                f"Failed to fetch PokeBattler articles for {day:%Y/%m/%d}: "
+                f"{response.status}"
+            )
+            return cached[2] if cached else []
+
     async def send_articles(self):
-        channel_entries = self.bot.database["channels"].find({"type": "pokebattler_articles"})
-        channels = [self.bot.get_channel(entry["channel_id"]) for entry in channel_entries]
-        for channel in channels:
-            article_urls_in_channel = []
-            async for message in channel.history(limit=100):
-                if message.embeds:
-                    embed = message.embeds[0]
-                    article_urls_in_channel.append(embed.url)
+        async def send(channel: discord.TextChannel):
+            if not await self.seen.is_known_channel(channel.id):
+                # Register articles posted before the seen set existed once
+                urls = [
+                    message.embeds[0].url
+                    async for message in channel.history(limit=100)
+                    if message.author == channel.guild.me
+                    and message.embeds
+                    and message.embeds[0].url
+                ]
+                await self.seen.add_many(channel.id, urls)
             for article in self.articles:
-                if article.url not in article_urls_in_channel:
+                if not await self.seen.is_seen(channel.id, article.url):
                     await channel.send(embed=PokeBattlerArticleEmbed(article))
+                    await self.seen.add(channel.id, article.url)
 
-
+        await fan_out(
+            self.bot,
+            "pokebattler_articles",
+            send,
+            self.logger,
+            CHANNEL_FANOUT_CONCURRENCY,
+        )
 
     @commands.slash_command(
         name="pokebattler_articles",
@@ -87,10 +143,10 @@ class PokeBattler(commands.Cog):
     @commands.guild_only()
     async def pogo_events(self, ctx: discord.ApplicationContext):
         # Check if channel is already in db and if not, add it else remove it
-        if self.bot.database["channels"].find_one(
+        if await self.bot.database["channels"].find_one(
             ({"channel_id": ctx.channel.id, "type": "pokebattler_articles"})
         ):
-            self.bot.database["channels"].delete_one(
+            await self.bot.database["channels"].delete_one(
                 {"channel_id": ctx.channel.id, "type": "pokebattler_articles"}
             )
             await ctx.respond(
@@ -99,7 +155,7 @@ class PokeBattler(commands.Cog):
                 delete_after=10,
             )
         else:
-            self.bot.database["channels"].insert_one(
+            await self.bot.database["channels"].insert_one(
                 {
                     "channel_id": ctx.channel.id,
                     "guild_id": ctx.guild.id,
@@ -1,3 +1,5 @@
+import asyncio
+import hashlib
 import json
 import logging
 from datetime import datetime, time
@@ -5,12 +7,20 @@ from datetime import datetime, time
 import aiohttp
 import discord
 import pytz
-from dateutil.parser import parse
 from discord.ext import commands, tasks
 
 from ehrenbot.bot import Ehrenbot
-from ehrenbot.types import PogoEventDates, PogoEventEmbedData, PogoEventResponse
+from ehrenbot.types import PogoEventEmbedData, PogoEventResponse
+from ehrenbot.embeds.pogo_event_reminder import PogoEventReminder
 from ehrenbot.embeds.pogo_upcoming_events import PogoUpComingEvents
+from ehrenbot.utils.fanout import fan_out
+from ehrenbot.utils.metrics import timed_task
+from ehrenbot.utils.pogo_events import EventIndex, EventScheduler
+from settings import (
+    CHANNEL_FANOUT_CONCURRENCY,
+    POGO_EVENT_END_REMINDERS,
+    POGO_EVENT_START_REMINDERS,
+)
 
 event_colors = {
     "community-day": 0xFFD700,
@@ -45,6 +55,13 @@ event_colors = {
 
 # list of every hour in a day
 when = [time(hour=x, minute=0) for x in range(24)]
+EVENTS_URL = "https://raw.githubusercontent.com/bigfoott/ScrapedDuck/data/events.min.json"
+
+
+def local_now() -> datetime:
+    """Current offset-naive time in the timezone the event times are read in."""
+    return datetime.now(pytz.timezone("Europe/Berlin")).replace(tzinfo=None)
+
 
 class Pokemon(commands.Cog):
     def __init__(self, bot):
@@ -54,8 +71,18 @@ class Pokemon(commands.Cog):
         self.logger.addHandler(self.bot.file_handler)
         self.logger.addHandler(self.bot.stream_handler)
 
-        self.events = {}
-        self.event_dates: list[PogoEventDates] = []
+        self.index = EventIndex(self.bot.database)
+        self.scheduler = EventScheduler(
+            POGO_EVENT_START_REMINDERS, POGO_EVENT_END_REMINDERS
+        )
+        self.replanned = asyncio.Event()
+        self.schedule_task: asyncio.Task = None
+        # Validators of the last feed response for conditional requests
+        self.etag: str = None
+        self.last_modified: str = None
+        self.events_hash: str = None
+        # Events hash and partition the channels were last updated with
+        self.rendered: tuple = None
         self.notes = {
             "raid-day": [
                 "Additional daily passes can only be obtained during the Raid Day hours for the specific Pokemon."
@@ -65,36 +92,17 @@ class Pokemon(commands.Cog):
 
     def cog_unload(self):
         self.do_fetch_events.cancel()
+        if self.schedule_task:
+            self.schedule_task.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self):
+        if self.schedule_task is None:
+            self.schedule_task = self.bot.loop.create_task(self.run_schedule())
         await self.fetch_events()
 
-    async def gather_event_dates(self):
-        self.event_dates = []
-        for event in self.events:
-            # Directly parse the start and end times without converting them to a specific timezone
-            event_start = parse(event.start)
-            event_end = parse(event.end)
-
-            # Ensure all datetime objects are offset-naive by removing timezone information
-            event_start = (
-                event_start.replace(tzinfo=None)
-                if event_start.tzinfo is not None
-                else event_start
-            )
-            event_end = (
-                event_end.replace(tzinfo=None)
-                if event_end.tzinfo is not None
-                else event_end
-            )
-
-            self.event_dates.append(
-                PogoEventDates(eventId=event.eventID, start=event_start, end=event_end)
-            )
-        self.event_dates.sort(key=lambda x: x.start)
-
     @tasks.loop(time=when)
+    @timed_task
     async def do_fetch_events(self):
         await self.fetch_events()
 
@@ -103,72 +111,147 @@ class Pokemon(commands.Cog):
         await self.bot.wait_until_ready()
 
     async def fetch_events(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://raw.githubusercontent.com/bigfoott/ScrapedDuck/data/events.min.json"
-            ) as response:
-                if response.status == 200:
-                    text = await response.text()
-                    try:
-                        data = json.loads(text)  # Parse text as JSON
-                        events = [PogoEventResponse(**event) for event in data]
-                        self.events = [
-                            PogoEventEmbedData(
-                                **event.dict(),
-                                notes=self.notes.get(event.eventType, []),
-                                color=event_colors.get(event.eventType, 0x708090),
-                            )
-                            for event in events
-                        ]
-                    except json.JSONDecodeError as e:
-                        self.logger.error(f"Failed to parse JSON: {e}")
-                else:
-                    self.logger.error(
-                        f"Failed to fetch Pokemon GO events with status: {response.status}"
-                    )
-        await self.gather_event_dates()
+        try:
+            await self.index.load()
+            headers = {}
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+            async with aiohttp.ClientSession() as session:
+                async with session.get(EVENTS_URL, headers=headers) as response:
+                    if response.status == 304:
+                        self.logger.debug("Pokemon GO events not modified")
+                    elif response.status == 200:
+                        text = await response.text()
+                        try:
+                            data = json.loads(text)  # Parse text as JSON
+                        except json.JSONDecodeError as e:
+                            self.logger.error(f"Failed to parse JSON: {e}")
+                        else:
+                            await self.update_events(data)
+                            # Only keep validators of a feed that was applied
+                            self.etag = response.headers.get("ETag")
+                            self.last_modified = response.headers.get("Last-Modified")
+                    else:
+                        self.logger.error(
+                            f"Failed to fetch Pokemon GO events with status: {response.status}"
+                        )
+        except Exception as e:
+            self.logger.error(f"Failed to fetch Pokemon GO events: {e}")
         await self.event_notifications()
 
+    async def update_events(self, data: list[dict]) -> None:
+        """Store the events if the parsed feed differs from the last one."""
+        events_hash = hashlib.sha256(
+            json.dumps(data, sort_keys=True).encode()
+        ).hexdigest()
+        if events_hash == self.events_hash:
+            return
+        events = [PogoEventResponse(**event) for event in data]
+        changed = await self.index.update(
+            [
+                PogoEventEmbedData(
+                    **event.dict(),
+                    notes=self.notes.get(event.eventType, []),
+                    color=event_colors.get(event.eventType, 0x708090),
+                )
+                for event in events
+            ]
+        )
+        self.logger.debug(
+            "Stored %d changed of %d Pokemon GO events", changed, len(self.index)
+        )
+        self.events_hash = events_hash
+        if changed:
+            self.replan()
+
+    def replan(self) -> None:
+        """Rebuild the timer heap and wake the schedule to pick it up."""
+        self.scheduler.plan(self.index, local_now())
+        self.replanned.set()
+        self.logger.debug("Planned %d Pokemon GO event timers", len(self.scheduler))
+
+    async def run_schedule(self):
+        """Sleep until the next event timer, or until the feed changes."""
+        try:
+            await self.index.load()
+        except Exception as e:
+            # The next fetch loads the index again and replans
+            self.logger.error(f"Failed to load Pokemon GO events: {e}")
+        self.replan()
+        while True:
+            due = self.scheduler.next_due()
+            timeout = None
+            if due is not None:
+                timeout = max((due - local_now()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self.replanned.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if self.replanned.is_set():
+                self.replanned.clear()
+                continue
+            try:
+                await self.handle_due(self.scheduler.pop_due(local_now()))
+            except Exception as e:
+                self.logger.error(f"Failed to handle Pokemon GO event timers: {e}")
+
+    async def handle_due(self, entries: list[tuple[str, str, int]]):
+        reminders = [entry for entry in entries if entry[0].endswith("_reminder")]
+        if len(reminders) < len(entries):
+            # An event started or ended, which changes the upcoming boards
+            await self.event_notifications()
+        if not reminders:
+            return
+        embeds = []
+        for kind, event_id, minutes in reminders:
+            action = "Starts" if kind == "start_reminder" else "Ends"
+            embeds.append(
+                PogoEventReminder(
+                    self.index.events[event_id],
+                    self.index.dates[event_id],
+                    f"{action} in {minutes} minutes",
+                )
+            )
+
+        async def send(channel: discord.TextChannel):
+            for embed in embeds:
+                await channel.send(embed=embed)
+
+        await fan_out(
+            self.bot, "pogo_events", send, self.logger, CHANNEL_FANOUT_CONCURRENCY
+        )
+
     async def event_notifications(self):
-        current_time = datetime.now(pytz.timezone("Europe/Berlin")).replace(tzinfo=None)
-        channel_entries = self.bot.database["channels"].find({"type": "pogo_events"})
-        channels = [
-            self.bot.get_channel(entry["channel_id"]) for entry in channel_entries
-        ]
-        active_events: list[PogoEventEmbedData] = []
-        upcoming_events: list[PogoEventEmbedData] = []
         try:
-            for event_date in self.event_dates:  # Sorted
-                event = next(
-                    (
-                        event
-                        for event in self.events
-                        if event.eventID == event_date.eventId
-                    ),
-                    None,
+            current_time = local_now()
+            active_events = self.index.active(current_time)
+            upcoming_events = self.index.upcoming(current_time)
+            rendered = (
+                self.events_hash,
+                tuple(event.eventID for event in active_events),
+                tuple(event.eventID for event in upcoming_events),
+            )
+            if rendered == self.rendered:
+                self.logger.debug("Pokemon GO events unchanged, skipping notifications")
+                return
+            upcoming_embed = PogoUpComingEvents(upcoming_events, self.index.dates)
+
+            async def send(channel: discord.TextChannel):
+                await self.bot.managed_messages.upsert(
+                    channel,
+                    "pogo_upcoming_events",
+                    find=lambda message: bool(message.embeds)
+                    and message.embeds[0].title == "Upcoming Events",
+                    embed=upcoming_embed,
                 )
-                if event is None:
-                    continue
-                if event_date.start > current_time:
-                    if len(upcoming_events) < 25:
-                        upcoming_events.append(event)
-                elif event_date.start <= current_time < event_date.end:
-                    active_events.append(event)
-                elif current_time >= event_date.end:
-                    pass
-            upcoming_embed = PogoUpComingEvents(upcoming_events, self.event_dates)
-            for channel in channels:
-                has_upcoming = False
-                async for message in channel.history(limit=100):
-                    if message.embeds:
-                        embed = message.embeds[0]
-                        if embed.title == "Upcoming Events":
-                            await message.edit(embed=upcoming_embed)
-                            has_upcoming = True
-                        else:
-                            continue
-                if not has_upcoming:
-                    await channel.send(embed=upcoming_embed)
+
+            await fan_out(
+                self.bot, "pogo_events", send, self.logger, CHANNEL_FANOUT_CONCURRENCY
+            )
+            # Failed channels catch up with the next change
+            self.rendered = rendered
         except Exception as e:
             self.logger.error(f"Failed to send event notifications: {e}")
 
@@ -179,10 +262,10 @@ class Pokemon(commands.Cog):
     @commands.guild_only()
     async def pogo_events(self, ctx: discord.ApplicationContext):
         # Check if channel is already in db and if not, add it else remove it
-        if self.bot.database["channels"].find_one(
+        if await self.bot.database["channels"].find_one(
             ({"channel_id": ctx.channel.id, "type": "pogo_events"})
         ):
-            self.bot.database["channels"].delete_one(
+            await self.bot.database["channels"].delete_one(
                 {"channel_id": ctx.channel.id, "type": "pogo_events"}
             )
             await ctx.respond(
@@ -191,7 +274,7 @@ class Pokemon(commands.Cog):
                 delete_after=10,
             )
         else:
-            self.bot.database["channels"].insert_one(
+            await self.bot.database["channels"].insert_one(
                 {
                     "channel_id": ctx.channel.id,
                     "guild_id": ctx.guild.id,
@@ -201,6 +284,8 @@ class Pokemon(commands.Cog):
             await ctx.respond(
                 "Channel added to event notifications.", ephemeral=True, delete_after=10
             )
+            # Post the board in the new channel on the next run
+            self.rendered = None
 
 
 def setup(bot):
@@ -1,19 +1,21 @@
-import asyncio
-import csv
 import logging
 from urllib.parse import parse_qs, urlparse
-from datetime import time, timezone
+from datetime import datetime, time, timezone
 
 import discord
 from discord.ext import commands, tasks
 
 from ehrenbot import Ehrenbot
 from ehrenbot.utils.exceptions import BungieAPIError
+from ehrenbot.utils.metrics import timed_task
 from ehrenbot.utils.registration import (
     check_profile_endpoints,
+    refresh_profiles,
     setup_profile,
     update_profile,
+    wait_for_token,
 )
+from ehrenbot.utils.subscriptions import SHADER_NOTIFICATIONS
 
 
 class Registration(commands.Cog):
@@ -37,7 +39,6 @@ class Registration(commands.Cog):
     @commands.guild_only()
     async def send_registration(self, ctx: discord.ApplicationContext):
         """Link your Bungie account with your Discord account"""
-        token_collection = self.bot.database["destiny_tokens"]
         try:
             await check_profile_endpoints(self.bot)
         except BungieAPIError:
@@ -57,20 +58,16 @@ class Registration(commands.Cog):
         query_dict = parse_qs(parts.query)
         state = query_dict["state"][0]
         # store the state in the database via update_one
-        self.bot.database["states"].update_one(
-            {"discord_id": ctx.author.id}, {"$set": {"state": state}}, upsert=True
+        await self.bot.database["states"].update_one(
+            {"discord_id": ctx.author.id},
+            {"$set": {"state": state, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
         )
+        future = self.bot.expect_registration(state)
         await ctx.author.send(url)
 
-        # Check during 300 seconds if the token has been stored in the database
-        token = token_collection.find_one({"discord_id": ctx.author.id})
-        if token is None:
-            for _ in range(300):
-                if token is None:
-                    await asyncio.sleep(1)
-                    token = token_collection.find_one({"discord_id": ctx.author.id})
-                else:
-                    break
+        # Wait for the OAuth callback to store the token
+        token = await wait_for_token(self.bot, state, ctx.author.id, future)
 
         if token is None:
             await ctx.author.send(
@@ -91,7 +88,9 @@ class Registration(commands.Cog):
                 await ctx.author.add_roles(role)
                 # Update memberhall
                 members_collection = self.bot.database["members"]
-                member = members_collection.find_one({"discord_id": ctx.author.id})
+                member = await members_collection.find_one(
+                    {"discord_id": ctx.author.id}
+                )
                 channel = ctx.guild.get_channel(member["channel_id"])
                 message = await channel.fetch_message(member["message_id"])
                 embed = message.embeds[0]
@@ -103,9 +102,9 @@ class Registration(commands.Cog):
                 embed.color = discord.Color.green()
                 await message.edit(content="", embed=embed)
                 # Insert member to shader notifications
-                with open("data/notify-shaders.csv", "a", encoding="utf-8") as file:
-                    writer = csv.writer(file)
-                    writer.writerow([ctx.author.id])
+                await self.bot.subscriptions.subscribe(
+                    SHADER_NOTIFICATIONS, ctx.author.id
+                )
             else:
                 await ctx.author.send(
                     "Something went wrong while updating your profile. Please contact the admin.",
@@ -117,33 +116,20 @@ class Registration(commands.Cog):
                 delete_after=10,
             )
 
-    @tasks.loop(hours=1)
+    @tasks.loop(minutes=1)
+    @timed_task
     async def update_tokens(self):
-        self.logger.debug("Updating tokens...")
-        token_collection = self.bot.database["destiny_tokens"]
-        oauth = self.bot.destiny_client.oauth
-        for token in token_collection.find():
-            new_token = await oauth.refresh_token(token["token"])
-            if new_token.get("membership_id") == token["membership_id"]:
-                token_collection.update_one(
-                    {"discord_id": token["discord_id"]}, {"$set": {"token": new_token}}
-                )
-                self.logger.debug("Updated token for %s", token["discord_id"])
-            else:
-                self.logger.warning(
-                    "Token for <membership_id> %s is invalid", token["membership_id"]
-                )
-        self.logger.info("Tokens updated.")
+        """Refresh the tokens that are about to expire."""
+        await self.bot.token_scheduler.refresh_due()
 
     @update_tokens.before_loop
     async def before_update_tokens(self):
         await self.bot.wait_until_ready()
 
     @tasks.loop(time=time(hour=3, tzinfo=timezone.utc))
+    @timed_task
     async def update_profiles(self):
-        token_collection = self.bot.database["tokens"]
-        for entry in token_collection.find():
-            await update_profile(self.bot, entry["discord_id"])
+        await refresh_profiles(self.bot, self.logger)
 
     @update_profiles.before_loop
     async def before_update_profiles(self):
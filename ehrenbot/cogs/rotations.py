@@ -1,5 +1,4 @@
 # pylint: disable=E0211,E1121,C0206,E1123
-import csv
 import logging
 from datetime import date, datetime, time, timedelta, timezone
 
@@ -7,8 +6,10 @@ import discord
 from discord.ext import commands, tasks
 
 from ehrenbot import Ehrenbot
+from ehrenbot.utils.metrics import timed_task
 from ehrenbot.utils.rotations import loop_check, vendor_rotations
 from ehrenbot.utils.rotations import xur_rotation
+from ehrenbot.utils.subscriptions import SHADER_NOTIFICATIONS
 
 
 class Rotations(commands.Cog):
@@ -79,10 +80,10 @@ class Rotations(commands.Cog):
     )
     async def activate_notifications_shader(self, ctx: discord.ApplicationContext):
         tokens = self.bot.database["destiny_tokens"]
-        with open("data/notify-shaders.csv", "w", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            for token in tokens.find():
-                writer.writerow([token["discord_id"]])
+        discord_ids = {
+            token["discord_id"] async for token in tokens.find({}, {"discord_id": 1})
+        }
+        await self.bot.subscriptions.replace(SHADER_NOTIFICATIONS, discord_ids)
         await ctx.respond("Shader notifications activated.", delete_after=5)
 
     @rotation.command(
@@ -116,7 +117,7 @@ class Rotations(commands.Cog):
 
         collection = self.bot.database["destiny_shaders"]
         for item in shaders:
-            existing_shader = collection.find_one({"hash": item["hash"]})
+            existing_shader = await collection.find_one({"hash": item["hash"]})
             if existing_shader:
                 continue
             new_shader = (
@@ -126,11 +127,12 @@ class Rotations(commands.Cog):
             new_shader["name"] = item["displayProperties"]["name"]
             new_shader["icon"] = item["displayProperties"]["icon"]
             new_shader["definition"] = item
-            collection.insert_one(new_shader)
+            await collection.insert_one(new_shader)
 
         await ctx.respond("Added all shaders to database.", delete_after=5)
 
     @tasks.loop(time=get_reset_time())
+    @timed_task
     async def daily_vendor_rotation(self):
         await vendor_rotations(self.bot, self.logger, 672118013)  # Banshee-44
         await vendor_rotations(self.bot, self.logger, 350061650)  # Ada-1
@@ -162,18 +164,18 @@ class Rotations(commands.Cog):
 
             # Send embed to vendor channel
             rotation_collection = self.bot.database["destiny_rotation"]
-            entry = rotation_collection.find_one({"vendor_hash": 2190858386})
+            entry = await rotation_collection.find_one({"vendor_hash": 2190858386})
             if entry is None:
-                rotation_collection.insert_one(
+                await rotation_collection.insert_one(
                     {"vendor_hash": 2190858386, "message_id": 0}
                 )
-            entry = rotation_collection.find_one({"vendor_hash": 2190858386})
+            entry = await rotation_collection.find_one({"vendor_hash": 2190858386})
             if entry["message_id"] == 0:
                 channel = discord.utils.get(
                     self.bot.get_all_channels(), name="vendor-sales"
                 )
                 message = await channel.send(content="", embed=embed)
-                rotation_collection.update_one(
+                await rotation_collection.update_one(
                     {"vendor_hash": 2190858386}, {"$set": {"message_id": message.id}}
                 )
             else:
@@ -187,6 +189,7 @@ class Rotations(commands.Cog):
             await xur_rotation(self.bot, self.logger)
 
     @tasks.loop(count=1)
+    @timed_task
     async def delete_emojis(self):
         xur_guid_id = 1057711135668850688
         banshee_guild_id = 1057709724843397282
@@ -1,4 +1,5 @@
 # pylint: disable=E0211,E1121
+import asyncio
 import logging
 from datetime import datetime
 
@@ -6,12 +7,17 @@ import discord
 from discord.ext import commands, tasks
 
 from ehrenbot import Ehrenbot
+from ehrenbot.utils.metrics import timed_task
 from ehrenbot.utils.status import (
     check_api_status,
     check_group_v2_status,
     check_user_status,
     check_vendor_status,
 )
+from ehrenbot.utils.status.history import StatusHistory, run_probe
+
+# Seconds before a status probe counts as timed out
+PROBE_TIMEOUT = 10
 
 
 class Status(commands.Cog):
@@ -21,12 +27,25 @@ class Status(commands.Cog):
         self.logger.setLevel(logging.DEBUG)
         self.logger.addHandler(self.bot.file_handler)
         self.logger.addHandler(self.bot.stream_handler)
+        self.history = StatusHistory(self.bot.database)
         self.api_status.start()
 
     def cog_unload(self) -> None:
         self.api_status.cancel()
 
+    async def check_vendor_status(self) -> dict:
+        # Resolved inside the probe, so a missing character fails only this probe
+        account = await self.bot.service_account.get()
+        return await check_vendor_status(
+            self.bot,
+            account.destiny_membership_id,
+            account.membership_type,
+            account.character_id,
+            account.token,
+        )
+
     @tasks.loop(minutes=10)
+    @timed_task
     async def api_status(self):
         channel: discord.TextChannel = discord.utils.get(
             self.bot.get_all_channels(), name="⚙｜api-status"
@@ -34,43 +53,55 @@ class Status(commands.Cog):
         if channel is None:
             return
 
-        token_collection = self.bot.database["destiny_tokens"]
-        profile_collection = self.bot.database["members"]
-        token = token_collection.find_one({"discord_id": self.bot.ADMIN_DISCORD_ID})[
-            "token"
+        probes = [
+            ("API", "GetDestinyManifest", check_api_status(self.bot)),
+            ("Vendor", "GetVendors", self.check_vendor_status()),
+            (
+                "User",
+                "GetProfile",
+                check_user_status(self.bot, 4611686018482584694, 3),
+            ),
+            ("GroupV2", "GetGroup", check_group_v2_status(self.bot, 4751301)),
         ]
-        profile = profile_collection.find_one(
-            {"discord_id": self.bot.ADMIN_DISCORD_ID}
-        )["destiny_profile"]
-        api_status = await check_api_status(self.bot)
-        destiny_membership_id = profile["destiny_membership_id"]
-        membership_type = profile["membership_type"]
-        character_id = profile["character_ids"][0]
-        vendor_status = await check_vendor_status(
-            self.bot, destiny_membership_id, membership_type, character_id, token
+        status = await asyncio.gather(
+            *(
+                run_probe(category, endpoint, probe, PROBE_TIMEOUT, self.logger)
+                for category, endpoint, probe in probes
+            )
         )
-        user_status = await check_user_status(self.bot, 4611686018482584694, 3)
-        group_v2_status = await check_group_v2_status(self.bot, 4751301)
-        status = [api_status, vendor_status, user_status, group_v2_status]
+        await self.history.record(status)
+        summary = await self.history.summary(hours=24)
 
         embed = discord.Embed(title="Bungie.Net API Status", color=0x2F3136)
         for stat in status:
-            embed.add_field(name="\u200bStatus", value=stat["Status"], inline=True)
+            value = stat["Status"]
+            if trend := summary.get(stat["Category"]):
+                if trend["p50"] is not None:
+                    value += (
+                        f"\np50 {trend['p50'] * 1000:.0f}ms"
+                        f" · p95 {trend['p95'] * 1000:.0f}ms"
+                    )
+                value += f"\n{trend['availability']:.1%} (24h)"
+            embed.add_field(name="\u200bStatus", value=value, inline=True)
             embed.add_field(name="\u200bCategory", value=stat["Category"], inline=True)
             embed.add_field(
                 name="\u200bUsed Endpoint", value=stat["Used Endpoint"], inline=True
             )
-            time = datetime.utcnow()
+        time = datetime.utcnow()
         embed.set_footer(text=f"Last updated: {time.strftime('%d/%m/%Y %H:%M:%S')} UTC")
         embed.set_image(
             url="https://www.bungie.net/pubassets/pkgs/157/157031/D2_DPS_Gif.gif"
         )
 
-        if channel.last_message_id is None:
-            await channel.send(embed=embed)
-        else:
-            message = (await channel.history(limit=1).flatten())[0]
-            await message.edit(content="", embed=embed)
+        await self.bot.managed_messages.upsert(
+            channel,
+            "api_status",
+            find=lambda message: any(
+                embed.title == "Bungie.Net API Status" for embed in message.embeds
+            ),
+            content="",
+            embed=embed,
+        )
 
     @api_status.before_loop
     async def before_api_status(self):
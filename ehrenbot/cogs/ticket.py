@@ -1,5 +1,6 @@
 # pylint: disable=unused-argument,missing-timeout
 import logging
+import time
 from logging import Logger
 
 import discord
@@ -12,6 +13,9 @@ from ehrenbot.utils.ticket import (
     sync_ticket,
 )
 
+# Ticket statuses that still have active views
+OPEN_STATUSES = ["Open", "In Work"]
+
 
 class Ticket(commands.Cog):
     def __init__(self, bot) -> None:
@@ -26,27 +30,44 @@ class Ticket(commands.Cog):
     async def on_ready(self) -> None:
         """Add persistent views to tickets on startup."""
         if not self.persistent_added:
+            started = time.perf_counter()
             self.bot.add_view(TicketSelect(bot=self.bot, logger=self.logger))
             ticket_collection = self.bot.database["destiny_tickets"]
-            for ticket in ticket_collection.find():
-                user_message_id: int = ticket.get("user_message_id")
+            tickets = await ticket_collection.find(
+                {"ticket.status": {"$in": OPEN_STATUSES}},
+                {
+                    "_id": 0,
+                    "admin_message_id": 1,
+                    "user_message_id": 1,
+                    "user_message_Id": 1,  # Legacy key of older tickets
+                    "ticket.category": 1,
+                },
+            ).to_list()
+            for ticket in tickets:
                 admin_message_id: int = ticket.get("admin_message_id")
-                ticket_status: str = ticket["ticket"]["status"]
-                if ticket_status != "Closed":
-                    if ticket["ticket"]["category"] == "Clan Join Request":
-                        self.bot.add_view(
-                            ClanRequestView(bot=self.bot, logger=self.logger),
-                            message_id=admin_message_id,
-                        )
-                    else:
-                        self.bot.add_view(
-                            view=TicketAdminView(bot=self.bot, logger=self.logger),
-                            message_id=admin_message_id,
-                        )
-                        self.bot.add_view(
-                            view=TicketUserView(bot=self.bot, logger=self.logger),
-                            message_id=user_message_id,
-                        )
+                user_message_id: int = ticket.get("user_message_id") or ticket.get(
+                    "user_message_Id"
+                )
+                if ticket["ticket"]["category"] == "Clan Join Request":
+                    self.bot.add_view(
+                        ClanRequestView(bot=self.bot, logger=self.logger),
+                        message_id=admin_message_id,
+                    )
+                else:
+                    self.bot.add_view(
+                        view=TicketAdminView(bot=self.bot, logger=self.logger),
+                        message_id=admin_message_id,
+                    )
+                    self.bot.add_view(
+                        view=TicketUserView(bot=self.bot, logger=self.logger),
+                        message_id=user_message_id,
+                    )
+            self.persistent_added = True
+            self.logger.info(
+                "Restored views of %d open tickets in %.3fs",
+                len(tickets),
+                time.perf_counter() - started,
+            )
 
     @commands.slash_command(
         name="ticket_system", description="Initializes the ticket system"
@@ -119,7 +140,7 @@ class TicketSelect(discord.ui.View):
         value = select.values[0]
         if value == "Clan Join Request":
             ticket_collection = self.bot.database["destiny_tickets"]
-            ticket_id = ticket_collection.count_documents({}) + 1
+            ticket_id = await self.bot.ticket_ids.next()
             guild = self.bot.get_guild(782316238247559189)
             admin_channel: discord.TextChannel = discord.utils.get(
                 guild.channels, name="📮｜admin-tickets"
@@ -139,7 +160,7 @@ class TicketSelect(discord.ui.View):
                 "ticket_id": ticket_id,
                 "status": "Open",
             }
-            ticket_collection.insert_one(
+            await ticket_collection.insert_one(
                 {
                     "ticket_id": ticket_id,
                     "ticket": ticket,
@@ -155,7 +176,7 @@ class TicketSelect(discord.ui.View):
             )
             # Check if user has registered. If not, send message to user.
             tokens = self.bot.database["destiny_tokens"]
-            if tokens.count_documents({"discord_id": interaction.user.id}) == 0:
+            if await tokens.count_documents({"discord_id": interaction.user.id}) == 0:
                 await interaction.user.send(
                     "You have not registered your Bungie account yet. "
                     "Please use the `/register` command to do so."
@@ -194,7 +215,7 @@ class TicketModal(discord.ui.Modal):
         """Callback for the modal."""
         await interaction.response.defer()
         ticket_collection = self.bot.database["destiny_tickets"]
-        ticket_id = ticket_collection.count_documents({}) + 1
+        ticket_id = await self.bot.ticket_ids.next()
         title = self.children[0].value
         category = self.category
         description = self.children[1].value
@@ -220,12 +241,12 @@ class TicketModal(discord.ui.Modal):
         )
         last_user_message = await interaction.user.dm_channel.history(limit=1).next()
         last_user_message_id = last_user_message.id
-        ticket_collection.insert_one(
+        await ticket_collection.insert_one(
             {
                 "ticket_id": ticket_id,
                 "ticket": ticket,
                 "admin_message_id": last_admin_message_id,
-                "user_message_Id": last_user_message_id,
+                "user_message_id": last_user_message_id,
                 "discord_id": interaction.user.id,
             }
         )
@@ -254,7 +275,7 @@ class TicketUserView(discord.ui.View):
         embed = interaction.message.embeds[0]
         ticket_id = int(embed.fields[0].value)
         ticket_collection = self.bot.database["destiny_tickets"]
-        ticket: dict = ticket_collection.find_one({"ticket_id": int(ticket_id)})
+        ticket: dict = await ticket_collection.find_one({"ticket_id": int(ticket_id)})
         if not ticket:
             await interaction.response.send_message(
                 "Ticket not found", ephemeral=True, delete_after=5
@@ -380,7 +401,7 @@ class TicketCloseModal(discord.ui.Modal):
         embed = await set_ticket_status(self.bot, self.embed, "Closed")
         # Get ticket from db
         ticket_collection = self.bot.database["destiny_tickets"]
-        ticket: dict = ticket_collection.find_one({"ticket_id": ticket_id})
+        ticket: dict = await ticket_collection.find_one({"ticket_id": ticket_id})
         if ticket is None:
             await interaction.followup.send(
                 "Ticket not found", ephemeral=True, delete_after=5
@@ -420,7 +441,7 @@ class ClanRequestView(discord.ui.View):
         ticket_id = int(embed.fields[0].value)
         # Get ticket from db
         ticket_collection = self.bot.database["destiny_tickets"]
-        ticket: dict = ticket_collection.find_one({"ticket_id": ticket_id})
+        ticket: dict = await ticket_collection.find_one({"ticket_id": ticket_id})
         if ticket is None:
             await interaction.followup.send(
                 "Ticket not found", ephemeral=True, delete_after=5
@@ -430,7 +451,9 @@ class ClanRequestView(discord.ui.View):
         discord_id: int = ticket["discord_id"]
         # Get destiny credentials from db
         profile_collection = self.bot.database["members"]
-        admin_profile = profile_collection.find_one({"discord_id": interaction.user.id})
+        admin_profile = await profile_collection.find_one(
+            {"discord_id": interaction.user.id}
+        )
         if admin_profile is None:
             await interaction.followup.send(
                 "Admin profile not found, please register.",
@@ -439,7 +462,7 @@ class ClanRequestView(discord.ui.View):
             )
             self.logger.warn("Admin profile not found")
             return
-        user_profile = profile_collection.find_one({"discord_id": discord_id})
+        user_profile = await profile_collection.find_one({"discord_id": discord_id})
         if user_profile is None:
             await interaction.followup.send(
                 "Destiny profile not found", ephemeral=True, delete_after=5
@@ -456,8 +479,8 @@ class ClanRequestView(discord.ui.View):
         admin_profile: dict = admin_profile["destiny_profile"]
         user_profile: dict = user_profile["destiny_profile"]
         token_collection = self.bot.database["destiny_tokens"]
-        admin_token: dict = token_collection.find_one(
-            {"discord_id": interaction.user.id}
+        admin_token: dict = (
+            await token_collection.find_one({"discord_id": interaction.user.id})
         )["token"]
         admin_group_id: int = admin_profile["group_id"]
 
@@ -488,7 +511,9 @@ class ClanRequestView(discord.ui.View):
             await user.add_roles(clan_role)
             self.logger.info("User %s was invited to Code Ehre", discord_id)
             ticket["ticket"]["status"] = "Closed"
-            ticket_collection.update_one({"ticket_id": ticket_id}, {"$set": ticket})
+            await ticket_collection.update_one(
+                {"ticket_id": ticket_id}, {"$set": ticket}
+            )
             message_id = ticket["admin_message_id"]
             channel: discord.TextChannel = discord.utils.get(
                 interaction.guild.channels, name="📮｜admin-tickets"
@@ -500,7 +525,7 @@ class ClanRequestView(discord.ui.View):
                 "User is already in the clan", ephemeral=True, delete_after=5
             )
             self.logger.info("User %d is already in the clan", discord_id)
-            ticket_collection.delete_one({"ticket_id": ticket_id})
+            await ticket_collection.delete_one({"ticket_id": ticket_id})
             message_id: int = ticket["admin_message_id"]
             channel: discord.TextChannel = discord.utils.get(
                 interaction.guild.channels, name="📮｜admin-tickets"
@@ -0,0 +1,29 @@
+from datetime import datetime
+import pytz
+
+import discord
+
+from ehrenbot.types import PogoEventDates, PogoEventEmbedData
+
+
+class PogoEventReminder(discord.Embed):
+    def __init__(
+        self, event: PogoEventEmbedData, event_date: PogoEventDates, description: str
+    ):
+        super().__init__(
+            title=event.name,
+            description=description,
+            color=event.color,
+            url=event.link,
+            timestamp=datetime.now(pytz.timezone("Europe/Berlin")),
+        )
+        self.set_thumbnail(url=event.thumbnail or event.image)
+        self.add_field(
+            name="Start", value=event_date.start.strftime("%d.%m.%Y %H:%M"), inline=True
+        )
+        self.add_field(
+            name="End", value=event_date.end.strftime("%d.%m.%Y %H:%M"), inline=True
+        )
+        for note in event.notes:
+            self.add_field(name="Note", value=note, inline=False)
+        self.set_footer(text=event.footer)
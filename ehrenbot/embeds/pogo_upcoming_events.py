@@ -8,7 +8,7 @@ from ehrenbot.types import PogoEventEmbedData, PogoEventDates
 
 class PogoUpComingEvents(discord.Embed):
     def __init__(
-        self, events: list[PogoEventEmbedData], event_dates: list[PogoEventDates]
+        self, events: list[PogoEventEmbedData], event_dates: dict[str, PogoEventDates]
     ):
         super().__init__(
             title="Upcoming Events",
@@ -21,9 +21,7 @@ class PogoUpComingEvents(discord.Embed):
         )
         self.set_footer(text="From Leekduck via ScrapedDuck")
         for event in events:
-            event_date = next(
-                (date for date in event_dates if date.eventId == event.eventID), None
-            )
+            event_date = event_dates.get(event.eventID)
             if event_date:
                 self.add_field(
                     name=event.name,
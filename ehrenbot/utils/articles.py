@@ -0,0 +1,39 @@
+import asyncio
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from ehrenbot.types import PokeBattlerArticle
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# Only the article elements of an archive page are built into a tree
+ARTICLES = SoupStrainer("article")
+
+
+def extract_articles(html: str, published: float) -> list[PokeBattlerArticle]:
+    """Extract the articles of a PokeBattler archive page."""
+    soup = BeautifulSoup(html, PARSER, parse_only=ARTICLES)
+    articles = []
+    for article in soup.find_all("article"):
+        heading = article.find("h2")
+        image = article.find("img")
+        link = article.find("a")
+        articles.append(
+            PokeBattlerArticle(
+                title=heading.text.strip() if heading else "No title",
+                url=link.get("href", "No URL") if link else "No URL",
+                image=image.get("src", "No image") if image else "No image",
+                published=published,
+            )
+        )
+    return articles
+
+
+async def parse_articles(html: str, published: float) -> list[PokeBattlerArticle]:
+    """Extract the articles in a worker thread to keep the event loop free."""
+    return await asyncio.to_thread(extract_articles, html, published)
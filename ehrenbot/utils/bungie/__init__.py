@@ -0,0 +1,13 @@
+from .cache import ResponseCache
+from .client import BungieClient
+from .coalesce import SingleFlight
+from .resilience import CircuitBreaker, TokenBucket, is_maintenance
+
+__all__ = [
+    "BungieClient",
+    "CircuitBreaker",
+    "ResponseCache",
+    "SingleFlight",
+    "TokenBucket",
+    "is_maintenance",
+]
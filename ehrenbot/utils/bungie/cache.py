@@ -0,0 +1,76 @@
+import json
+import time
+from collections import OrderedDict, defaultdict
+
+# Seconds a successful response of a read-only endpoint stays valid
+DEFAULT_TTLS = {
+    "destiny2.GetDestinyManifest": 300,
+    "destiny2.GetProfile": 60,
+    "destiny2.GetVendors": 120,
+    "group_v2.GetGroup": 300,
+    "group_v2.GetGroupsForMember": 300,
+    "user.GetMembershipDataForCurrentUser": 300,
+}
+
+
+def request_key(endpoint: str, args: tuple, kwargs: dict) -> tuple:
+    """Build a hashable key for an endpoint call.
+
+    Authenticated calls are keyed by the token's membership id instead of the
+    token itself, so responses of different users never mix while a refreshed
+    token still hits the same entries."""
+    kwargs = dict(kwargs)
+    token = kwargs.pop("token", None)
+    principal = token.get("membership_id") if isinstance(token, dict) else None
+    arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return endpoint, principal, arguments
+
+
+class ResponseCache:
+    """In-memory TTL cache for read-only Bungie API responses."""
+
+    def __init__(self, ttls: dict = None, max_entries: int = 2048) -> None:
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self.hits: defaultdict[str, int] = defaultdict(int)
+        self.misses: defaultdict[str, int] = defaultdict(int)
+
+    def is_cached(self, endpoint: str) -> bool:
+        return endpoint in self.ttls
+
+    def get(self, key: tuple) -> dict:
+        endpoint = key[0]
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses[endpoint] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits[endpoint] += 1
+        return entry[1]
+
+    def set(self, key: tuple, response: dict) -> None:
+        """Store a response. Only successful responses are cached."""
+        if not response or response.get("ErrorCode") != 1:
+            return
+        self._entries[key] = (time.monotonic() + self.ttls[key[0]], response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hits, misses and hit rate per endpoint."""
+        stats = {}
+        for endpoint in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits[endpoint]
+            total = hits + self.misses[endpoint]
+            stats[endpoint] = {
+                "hits": hits,
+                "misses": self.misses[endpoint],
+                "hit_rate": hits / total if total else 0.0,
+            }
+        return stats
@@ -0,0 +1,157 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import defaultdict
+
+from destipy.destiny_client import DestinyClient
+
+from ..metrics import Histogram
+from .cache import ResponseCache, request_key
+from .coalesce import SingleFlight
+from .resilience import (
+    THROTTLE_ERROR_CODES,
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    maintenance_response,
+)
+
+
+class EndpointGroup:
+    """Proxy for an endpoint group like ``destiny2`` that routes calls through
+    the client."""
+
+    def __init__(
+        self, client: "BungieClient", name: str, group, cached: bool = True
+    ) -> None:
+        self._client = client
+        self._name = name
+        self._group = group
+        self._cached = cached
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._group, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+        endpoint = f"{self._name}.{name}"
+
+        async def call(*args, **kwargs):
+            if not self._cached:
+                return await self._client.request(endpoint, attr, args, kwargs)
+            return await self._client.call(endpoint, attr, args, kwargs)
+
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+
+
+class BungieClient:
+    """Drop-in wrapper around DestinyClient.
+
+    Endpoint calls like ``client.destiny2.GetProfile(...)`` behave as before
+    but go through shared middleware: responses of read-only endpoints are
+    served from a TTL cache, concurrent identical read-only calls share one
+    in-flight request, requests are rate limited by a token bucket,
+    transient failures are retried with jittered exponential backoff, and a
+    circuit breaker fails fast while Bungie is in maintenance.
+    Everything else, e.g. ``oauth``, is passed through unchanged."""
+
+    GROUPS = ("destiny2", "group_v2", "user")
+
+    def __init__(
+        self,
+        client: DestinyClient,
+        cache: ResponseCache,
+        limiter: TokenBucket,
+        logger: logging.Logger,
+        max_retries: int = 3,
+        probe_interval: int = 300,
+    ) -> None:
+        self.client = client
+        self.cache = cache
+        self.limiter = limiter
+        self.logger = logger
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker(
+            client.destiny2.GetDestinyManifest, probe_interval, logger
+        )
+        self.single_flight = SingleFlight()
+        self.retries: defaultdict[str, int] = defaultdict(int)
+        self.rejected: defaultdict[str, int] = defaultdict(int)
+        # Requests sent to Bungie, by endpoint and ErrorCode ("none" if failed)
+        self.error_codes: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.latencies: defaultdict[str, Histogram] = defaultdict(Histogram)
+        for group in self.GROUPS:
+            setattr(self, group, EndpointGroup(self, group, getattr(client, group)))
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def fresh(self, group: str) -> EndpointGroup:
+        """Endpoint group that skips the cache and coalescing, e.g. for probes.
+
+        Calls are still rate limited, retried and guarded by the breaker."""
+        return EndpointGroup(self, group, getattr(self.client, group), cached=False)
+
+    async def call(self, endpoint: str, func, args: tuple, kwargs: dict) -> dict:
+        if not endpoint.rsplit(".", 1)[-1].startswith("Get"):
+            return await self.request(endpoint, func, args, kwargs)
+        key = request_key(endpoint, args, kwargs)
+        if self.cache.is_cached(endpoint):
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+
+        async def fetch() -> dict:
+            response = await self.request(endpoint, func, args, kwargs)
+            if self.cache.is_cached(endpoint):
+                self.cache.set(key, response)
+            return response
+
+        return await self.single_flight.do(key, fetch)
+
+    async def decode_hash(self, hash_id, definition, language="en") -> dict:
+        """Decode a manifest hash, sharing concurrent lookups of the same hash."""
+        key = request_key("decode_hash", (hash_id, definition, language), {})
+        return await self.single_flight.do(
+            key, lambda: self.client.decode_hash(hash_id, definition, language)
+        )
+
+    async def request(self, endpoint: str, func, args: tuple, kwargs: dict) -> dict:
+        """Send a request through the circuit breaker, rate limiter and retries.
+
+        destipy returns None when a request failed. Such calls are only
+        retried for read-only endpoints, throttled calls are always retried."""
+        read_only = endpoint.rsplit(".", 1)[-1].startswith("Get")
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.is_open:
+                self.rejected[endpoint] += 1
+                return maintenance_response()
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            response = await func(*args, **kwargs)
+            self.latencies[endpoint].observe(time.perf_counter() - started)
+            code = response.get("ErrorCode", "none") if response else "none"
+            self.error_codes[(endpoint, str(code))] += 1
+            self.breaker.record(response)
+            if response is None:
+                if not read_only or attempt == self.max_retries:
+                    return response
+                delay = backoff_delay(attempt)
+            elif response.get("ErrorCode") in THROTTLE_ERROR_CODES:
+                if attempt == self.max_retries:
+                    return response
+                # Let every caller back off, not just this one
+                self.limiter.penalize(
+                    max(backoff_delay(attempt), response.get("ThrottleSeconds", 0))
+                )
+                delay = 0
+            else:
+                return response
+            self.retries[endpoint] += 1
+            self.logger.debug(
+                "Retrying %s (attempt %d/%d)", endpoint, attempt + 1, self.max_retries
+            )
+            await asyncio.sleep(delay)
+        return response
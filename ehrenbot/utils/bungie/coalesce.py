@@ -0,0 +1,39 @@
+import asyncio
+from collections import defaultdict
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one in-flight request.
+
+    The first caller for a key starts the request, callers arriving while it
+    is still running await the same task instead of sending their own.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self.calls: defaultdict[str, int] = defaultdict(int)
+        self.deduplicated: defaultdict[str, int] = defaultdict(int)
+
+    async def do(self, key: tuple, func):
+        """Run ``func()`` once for all concurrent callers with the same key."""
+        endpoint = key[0]
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls[endpoint] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.deduplicated[endpoint] += 1
+        # A cancelled caller must not cancel the request other callers share
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Return executed and deduplicated calls per endpoint."""
+        return {
+            endpoint: {
+                "calls": self.calls[endpoint],
+                "deduplicated": self.deduplicated[endpoint],
+            }
+            for endpoint in sorted(set(self.calls) | set(self.deduplicated))
+        }
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import random
+import time
+
+# Bungie ErrorCodes
+SUCCESS = 1
+SYSTEM_DISABLED = 5  # Maintenance
+THROTTLE_ERROR_CODES = {
+    35,  # ThrottleLimitExceeded
+    36,  # ThrottleLimitExceededMinutes
+    37,  # ThrottleLimitExceededMomentarily
+    38,  # ThrottleLimitExceededSeconds
+    51,  # PerApplicationThrottleExceeded
+    52,  # PerApplicationAnonymousThrottleExceeded
+    53,  # PerApplicationAuthenticatedThrottleExceeded
+    1672,  # DestinyThrottledByGameServer
+}
+
+
+def is_maintenance(response: dict) -> bool:
+    """True if the Bungie API answered that it is in maintenance mode."""
+    return bool(response) and response.get("ErrorCode") == SYSTEM_DISABLED
+
+
+def maintenance_response() -> dict:
+    """Response returned to callers while the circuit breaker is open."""
+    return {
+        "ErrorCode": SYSTEM_DISABLED,
+        "ErrorStatus": "SystemDisabled",
+        "Message": "Bungie API is in maintenance mode (circuit open)",
+        "Response": {},
+    }
+
+
+class TokenBucket:
+    """Token bucket rate limiter shared by all Bungie API calls."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so every caller waits at least ``seconds``."""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class CircuitBreaker:
+    """Opens when Bungie reports maintenance and probes until it is back.
+
+    While open, calls fail fast with a maintenance response instead of
+    reaching the API. A background task runs ``probe`` every
+    ``probe_interval`` seconds and closes the breaker once it succeeds.
+    """
+
+    def __init__(self, probe, probe_interval: int, logger: logging.Logger) -> None:
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.logger = logger
+        self.opened_at: float = None
+        self._closed = asyncio.Event()
+        self._closed.set()
+        self._probe_task: asyncio.Task = None
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closed.is_set()
+
+    def record(self, response: dict) -> None:
+        if is_maintenance(response) and not self.is_open:
+            self.open()
+
+    def open(self) -> None:
+        self.logger.warning(
+            "Bungie API is in maintenance mode, failing fast until it is back"
+        )
+        self.opened_at = time.monotonic()
+        self._closed.clear()
+        self._probe_task = asyncio.create_task(self._probe_until_closed())
+
+    def close(self) -> None:
+        self.logger.info(
+            "Bungie API is back after %.0fs", time.monotonic() - self.opened_at
+        )
+        self.opened_at = None
+        self._closed.set()
+
+    async def wait_until_closed(self) -> None:
+        await self._closed.wait()
+
+    async def _probe_until_closed(self) -> None:
+        while self.is_open:
+            await asyncio.sleep(self.probe_interval)
+            response = await self.probe()
+            if response and response.get("ErrorCode") == SUCCESS:
+                self.close()
+            else:
+                self.logger.debug("Bungie API still unavailable, probing again")
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
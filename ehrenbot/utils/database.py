@@ -0,0 +1,175 @@
+import asyncio
+import functools
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+
+class QueryStats:
+    """Per ``(collection, operation)`` call counts and latencies."""
+
+    def __init__(self) -> None:
+        self.calls: defaultdict[tuple, int] = defaultdict(int)
+        self.errors: defaultdict[tuple, int] = defaultdict(int)
+        self.total: defaultdict[tuple, float] = defaultdict(float)
+        self.max: defaultdict[tuple, float] = defaultdict(float)
+
+    def record(self, key: tuple, seconds: float, failed: bool = False) -> None:
+        self.calls[key] += 1
+        self.total[key] += seconds
+        self.max[key] = max(self.max[key], seconds)
+        if failed:
+            self.errors[key] += 1
+
+    def stats(self) -> dict:
+        """Return calls, errors, mean and max latency in ms per operation."""
+        return {
+            f"{collection}.{operation}": {
+                "calls": self.calls[(collection, operation)],
+                "errors": self.errors[(collection, operation)],
+                "mean_ms": 1000
+                * self.total[(collection, operation)]
+                / self.calls[(collection, operation)],
+                "max_ms": 1000 * self.max[(collection, operation)],
+            }
+            for collection, operation in sorted(self.calls)
+        }
+
+
+class AsyncDatabase:
+    """Runs pymongo calls on a dedicated thread pool.
+
+    Mirrors the parts of the pymongo API the bot uses, but every call is
+    awaited so network round trips never block the gateway event loop.
+    ``sync`` is the underlying pymongo database for code that already runs
+    off the loop.
+    """
+
+    def __init__(self, database: Database, max_workers: int) -> None:
+        self.sync = database
+        self.name = database.name
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="mongo")
+        self.query_stats = QueryStats()
+        self._collections: dict[str, AsyncCollection] = {}
+
+    def __getitem__(self, name: str) -> "AsyncCollection":
+        if name not in self._collections:
+            self._collections[name] = AsyncCollection(self, self.sync[name])
+        return self._collections[name]
+
+    async def run(self, collection: str, operation: str, func, *args, **kwargs):
+        """Run a blocking pymongo call in the executor and record its latency."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await loop.run_in_executor(
+                self.executor, functools.partial(func, *args, **kwargs)
+            )
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.query_stats.record(
+                (collection, operation), time.perf_counter() - start, failed
+            )
+
+    async def command(self, *args, **kwargs):
+        return await self.run("$cmd", "command", self.sync.command, *args, **kwargs)
+
+    async def create_collection(self, name: str, **kwargs) -> None:
+        await self.run(name, "create", self.sync.create_collection, name, **kwargs)
+
+    async def list_collection_names(self) -> list[str]:
+        return await self.run(
+            "$cmd", "listCollections", self.sync.list_collection_names
+        )
+
+    def stats(self) -> dict:
+        return self.query_stats.stats()
+
+
+def _in_executor(operation: str):
+    """Build an awaitable wrapper around a pymongo ``Collection`` method."""
+
+    async def method(self: "AsyncCollection", *args, **kwargs):
+        return await self.database.run(
+            self.name, operation, getattr(self.collection, operation), *args, **kwargs
+        )
+
+    method.__name__ = operation
+    method.__doc__ = f"Awaitable ``Collection.{operation}``."
+    return method
+
+
+class AsyncCollection:
+    """Awaitable facade over a pymongo ``Collection``."""
+
+    def __init__(self, database: AsyncDatabase, collection: Collection) -> None:
+        self.database = database
+        self.collection = collection
+        self.name = collection.name
+
+    bulk_write = _in_executor("bulk_write")
+    count_documents = _in_executor("count_documents")
+    create_index = _in_executor("create_index")
+    delete_many = _in_executor("delete_many")
+    delete_one = _in_executor("delete_one")
+    distinct = _in_executor("distinct")
+    find_one = _in_executor("find_one")
+    find_one_and_update = _in_executor("find_one_and_update")
+    insert_many = _in_executor("insert_many")
+    insert_one = _in_executor("insert_one")
+    replace_one = _in_executor("replace_one")
+    update_many = _in_executor("update_many")
+    update_one = _in_executor("update_one")
+
+    def find(self, *args, **kwargs) -> "AsyncCursor":
+        """Return a cursor, the query only runs once it is iterated."""
+        return AsyncCursor(self, args, kwargs)
+
+
+class AsyncCursor:
+    """Lazy ``find`` cursor that fetches all results in one executor call."""
+
+    def __init__(self, collection: AsyncCollection, args: tuple, kwargs: dict) -> None:
+        self.collection = collection
+        self.args = args
+        self.kwargs = kwargs
+
+    def sort(self, key_or_list, direction: int = ASCENDING) -> "AsyncCursor":
+        if isinstance(key_or_list, str):
+            key_or_list = [(key_or_list, direction)]
+        self.kwargs["sort"] = key_or_list
+        return self
+
+    def limit(self, limit: int) -> "AsyncCursor":
+        self.kwargs["limit"] = limit
+        return self
+
+    def _fetch(self) -> list:
+        return list(self.collection.collection.find(*self.args, **self.kwargs))
+
+    async def to_list(self, length: int = None) -> list:
+        if length is not None:
+            self.kwargs["limit"] = length
+        return await self.collection.database.run(
+            self.collection.name, "find", self._fetch
+        )
+
+    async def explain(self) -> dict:
+        return await self.collection.database.run(
+            self.collection.name,
+            "explain",
+            lambda: self.collection.collection.find(
+                *self.args, **self.kwargs
+            ).explain(),
+        )
+
+    async def __aiter__(self):
+        for document in await self.to_list():
+            yield document
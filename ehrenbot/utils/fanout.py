@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+from ehrenbot import Ehrenbot
+
+# Discord JSON error code of a deleted channel
+UNKNOWN_CHANNEL = 10003
+
+
+async def fan_out(
+    bot: Ehrenbot,
+    channel_type: str,
+    send: Callable[[discord.TextChannel], Awaitable],
+    logger: logging.Logger,
+    concurrency: int,
+) -> dict[int, float]:
+    """Run ``send`` for every channel subscribed to ``channel_type``.
+
+    At most ``concurrency`` channels are handled at once and a failing
+    channel does not affect the others. Subscriptions of deleted channels
+    are removed in one write. Returns the seconds taken per successful
+    channel id.
+    """
+    channel_entries = (
+        await bot.database["channels"]
+        .find({"type": channel_type}, {"channel_id": 1, "guild_id": 1, "_id": 0})
+        .to_list()
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[int, float] = {}
+    dead: list[int] = []
+
+    async def run(entry: dict) -> None:
+        channel_id = entry["channel_id"]
+        channel = bot.get_channel(channel_id)
+        if channel is None:
+            # An unavailable guild hides its channels without deleting them
+            if bot.get_guild(entry.get("guild_id")) is not None:
+                dead.append(channel_id)
+            else:
+                logger.debug("Skipping %s channel %s", channel_type, channel_id)
+            return
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await send(channel)
+            except Exception as e:
+                if isinstance(e, discord.NotFound) and e.code == UNKNOWN_CHANNEL:
+                    dead.append(channel_id)
+                else:
+                    logger.error(
+                        "Failed to update %s channel %s: %s", channel_type, channel, e
+                    )
+                return
+            latencies[channel_id] = time.perf_counter() - started
+
+    await asyncio.gather(*(run(entry) for entry in channel_entries))
+    if dead:
+        await bot.database["channels"].delete_many(
+            {"type": channel_type, "channel_id": {"$in": dead}}
+        )
+        await bot.managed_messages.forget_channels(dead)
+        logger.info("Removed %d deleted %s channels", len(dead), channel_type)
+    if latencies:
+        slowest = max(latencies, key=latencies.get)
+        logger.debug(
+            "Updated %d %s channels, slowest %s took %.2fs",
+            len(latencies),
+            channel_type,
+            slowest,
+            latencies[slowest],
+        )
+    return latencies
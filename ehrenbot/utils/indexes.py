@@ -0,0 +1,176 @@
+import logging
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from ehrenbot.utils.database import AsyncDatabase
+
+DUPLICATE_KEY = 11000
+INDEX_CONFLICTS = {85, 86}  # IndexOptionsConflict, IndexKeySpecsConflict
+
+# collection -> [(keys, options)]
+INDEXES: dict[str, list[tuple[list, dict]]] = {
+    "members": [([("discord_id", ASCENDING)], {"unique": True})],
+    "destiny_tokens": [([("discord_id", ASCENDING)], {"unique": True})],
+    "destiny_tickets": [
+        ([("ticket_id", ASCENDING)], {"unique": True}),
+        ([("ticket.status", ASCENDING)], {}),
+    ],
+    "destiny_rotation": [([("vendor_hash", ASCENDING)], {"unique": True})],
+    "destiny_shaders": [([("hash", ASCENDING)], {"unique": True})],
+    "states": [
+        ([("state", ASCENDING)], {"unique": True}),
+        ([("discord_id", ASCENDING)], {"unique": True}),
+    ],
+    "channels": [
+        ([("type", ASCENDING), ("channel_id", ASCENDING)], {"unique": True}),
+    ],
+    "subscriptions": [
+        ([("topic", ASCENDING), ("discord_id", ASCENDING)], {"unique": True}),
+    ],
+    "temp_channels": [([("channel_type", ASCENDING)], {"unique": True})],
+    "api_status_history": [([("timestamp", ASCENDING)], {})],
+    "pogo_events": [([("eventID", ASCENDING)], {"unique": True})],
+    "pokebattler_seen": [
+        ([("channel_id", ASCENDING), ("url", ASCENDING)], {"unique": True}),
+        # Articles are only needed while they are still on the fetched pages
+        ([("seen_at", ASCENDING)], {"expireAfterSeconds": 90 * 24 * 60 * 60}),
+    ],
+    "managed_messages": [
+        ([("channel_id", ASCENDING), ("purpose", ASCENDING)], {"unique": True})
+    ],
+}
+
+# Member hall fields, the newest duplicate of a member holds the current ones
+MEMBER_HALL_FIELDS = ["message_id", "channel_id", "joined_at", "invite_url", "is_bot"]
+
+# Capped collections, oldest documents are dropped once a limit is reached
+CAPPED_COLLECTIONS: dict[str, dict] = {
+    # Four probes every 10 minutes, about a week of history
+    "api_status_history": {"size": 1024 * 1024, "max": 4032},
+}
+
+# Representative filters of the hot lookups, checked with explain at startup
+HOT_QUERIES: list[tuple[str, dict]] = [
+    ("members", {"discord_id": 0}),
+    ("destiny_tokens", {"discord_id": 0}),
+    ("destiny_tokens", {"discord_id": {"$in": [0]}}),
+    ("destiny_tickets", {"ticket_id": 0}),
+    ("destiny_tickets", {"ticket.status": {"$in": ["Open", "In Work"]}}),
+    ("destiny_rotation", {"vendor_hash": 0}),
+    ("destiny_shaders", {"hash": 0}),
+    ("states", {"state": ""}),
+    ("states", {"discord_id": 0}),
+    ("channels", {"type": ""}),
+    ("channels", {"type": "", "channel_id": 0}),
+    ("subscriptions", {"topic": ""}),
+]
+
+
+async def ensure_indexes(
+    database: AsyncDatabase, logger: logging.Logger, state_ttl: int
+) -> None:
+    """Create the indexes of all hot collections if they do not exist yet.
+
+    A unique index that cannot be built because of existing duplicates is
+    created without the unique constraint and reported, so lookups stay
+    indexed until the data is cleaned up. Duplicate members are merged
+    instead."""
+    existing = set(await database.list_collection_names())
+    for name, options in CAPPED_COLLECTIONS.items():
+        if name not in existing:
+            await database.create_collection(name, capped=True, **options)
+    for name, indexes in INDEXES.items():
+        collection = database[name]
+        for keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except OperationFailure as ex:
+                if ex.code in INDEX_CONFLICTS:
+                    logger.warning(
+                        "Keeping existing index %s on %s: %s", keys, name, ex
+                    )
+                    continue
+                if ex.code != DUPLICATE_KEY or not options.get("unique"):
+                    raise
+                if name == "members":
+                    merged = await merge_member_duplicates(collection)
+                    logger.warning("Merged %d duplicate members", merged)
+                    await collection.create_index(keys, **options)
+                    continue
+                logger.error(
+                    "Duplicate %s in %s, creating a non unique index instead",
+                    [key for key, _ in keys],
+                    name,
+                )
+                await collection.create_index(keys, **{**options, "unique": False})
+    # Expire OAuth states that were never completed
+    await database["states"].create_index(
+        [("created_at", ASCENDING)], expireAfterSeconds=state_ttl
+    )
+    logger.info("Ensured indexes of %d collections", len(INDEXES))
+
+
+async def merge_member_duplicates(collection) -> int:
+    """Merge the documents of every member into one, return how many were
+    merged away.
+
+    The document holding the Destiny profile is kept, or the oldest one if
+    none does. Fields it lacks are taken from the other documents and the
+    member hall fields from the newest one."""
+    counts: dict[int, int] = {}
+    async for entry in collection.find({}, {"discord_id": 1, "_id": 0}):
+        discord_id = entry.get("discord_id")
+        counts[discord_id] = counts.get(discord_id, 0) + 1
+    duplicated = [discord_id for discord_id, count in counts.items() if count > 1]
+    groups: dict[int, list[dict]] = {}
+    async for entry in collection.find({"discord_id": {"$in": duplicated}}).sort(
+        "_id", ASCENDING
+    ):
+        groups.setdefault(entry["discord_id"], []).append(entry)
+    merged = 0
+    for entries in groups.values():
+        keep = next(
+            (entry for entry in entries if "destiny_profile" in entry), entries[0]
+        )
+        fields = {}
+        for entry in entries:
+            fields.update(
+                {key: value for key, value in entry.items() if key not in keep}
+            )
+        newest = entries[-1]
+        fields.update({key: newest[key] for key in MEMBER_HALL_FIELDS if key in newest})
+        if fields:
+            await collection.update_one({"_id": keep["_id"]}, {"$set": fields})
+        others = [entry["_id"] for entry in entries if entry is not keep]
+        await collection.delete_many({"_id": {"$in": others}})
+        merged += len(others)
+    return merged
+
+
+def _stages(plan: dict) -> set[str]:
+    """Collect every stage name of an explain plan tree."""
+    stages = {plan.get("stage")}
+    for child in plan.get("inputStages", []) + [plan.get("inputStage")]:
+        if child:
+            stages |= _stages(child)
+    return stages
+
+
+async def report_collection_scans(
+    database: AsyncDatabase, logger: logging.Logger
+) -> list[str]:
+    """Explain the hot queries and report the ones doing a collection scan."""
+    scans = []
+    for name, query in HOT_QUERIES:
+        try:
+            explain = await database[name].find(query).explain()
+        except Exception as ex:
+            logger.debug("Could not explain %s on %s: %s", query, name, ex)
+            continue
+        plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _stages(plan):
+            scans.append(f"{name} {query}")
+    for scan in scans:
+        logger.warning("Query still does a collection scan: %s", scan)
+    return scans
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Callable
+
+import discord
+
+from ehrenbot.utils.database import AsyncDatabase
+
+
+class ManagedMessages:
+    """Registry of bot-managed messages keyed by ``(channel_id, purpose)``.
+
+    Boards like the API status or the upcoming events are edited in place
+    through their stored message id. The channel history is only scanned
+    when no id is stored or the stored message was deleted.
+    """
+
+    def __init__(self, database: AsyncDatabase, logger: logging.Logger) -> None:
+        self.collection = database["managed_messages"]
+        self.logger = logger
+        self._ids: dict[tuple[int, str], int] = None
+        self._load_lock = asyncio.Lock()
+
+    async def _load(self) -> dict[tuple[int, str], int]:
+        async with self._load_lock:
+            if self._ids is None:
+                entries = await self.collection.find({}, {"_id": 0}).to_list()
+                self._ids = {
+                    (entry["channel_id"], entry["purpose"]): entry["message_id"]
+                    for entry in entries
+                }
+        return self._ids
+
+    async def message_id(self, channel_id: int, purpose: str) -> int:
+        return (await self._load()).get((channel_id, purpose))
+
+    async def remember(self, channel_id: int, purpose: str, message_id: int) -> None:
+        ids = await self._load()
+        if ids.get((channel_id, purpose)) == message_id:
+            return
+        await self.collection.update_one(
+            {"channel_id": channel_id, "purpose": purpose},
+            {"$set": {"message_id": message_id}},
+            upsert=True,
+        )
+        ids[(channel_id, purpose)] = message_id
+
+    async def forget(self, channel_id: int, purpose: str) -> None:
+        ids = await self._load()
+        if ids.pop((channel_id, purpose), None) is not None:
+            await self.collection.delete_one(
+                {"channel_id": channel_id, "purpose": purpose}
+            )
+
+    async def forget_channels(self, channel_ids: list[int]) -> None:
+        """Drop every managed message of deleted channels."""
+        ids = await self._load()
+        for key in [key for key in ids if key[0] in channel_ids]:
+            del ids[key]
+        await self.collection.delete_many({"channel_id": {"$in": channel_ids}})
+
+    async def upsert(
+        self,
+        channel: discord.TextChannel,
+        purpose: str,
+        find: Callable[[discord.Message], bool] = None,
+        **fields,
+    ) -> discord.Message:
+        """Edit the managed message of a channel or send it if there is none.
+
+        ``find`` identifies an existing message in the channel history and is
+        only used when no message id is stored or it no longer exists."""
+        if message_id := await self.message_id(channel.id, purpose):
+            try:
+                return await channel.get_partial_message(message_id).edit(**fields)
+            except discord.NotFound:
+                self.logger.debug("Managed message %s in %s is gone", purpose, channel)
+                await self.forget(channel.id, purpose)
+        if find is not None:
+            async for message in channel.history(limit=100):
+                if message.author == channel.guild.me and find(message):
+                    await self.remember(channel.id, purpose, message.id)
+                    return await message.edit(**fields)
+        message = await channel.send(**fields)
+        await self.remember(channel.id, purpose, message.id)
+        return message
@@ -0,0 +1,263 @@
+import asyncio
+import bisect
+import functools
+import math
+import time
+from collections import defaultdict
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class Histogram:
+    """Bucket counts plus sum and count of observations."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.bounds = buckets
+        # One extra bucket for everything above the last bound
+        self.buckets = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its bucket."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+
+class Metrics:
+    """Runtime metrics that are not owned by another component.
+
+    Bungie, cache and Mongo statistics live on their clients and are read
+    when the metrics are rendered. This only tracks the event loop lag and
+    task loop runs.
+    """
+
+    def __init__(self) -> None:
+        self.loop_lag = 0.0
+        self.loop_lag_max = 0.0
+        self.task_durations: defaultdict[str, Histogram] = defaultdict(
+            lambda: Histogram(TASK_BUCKETS)
+        )
+        self.task_failures: defaultdict[str, int] = defaultdict(int)
+        self.task_last_run: dict[str, float] = {}
+
+    def record_task(self, name: str, seconds: float, failed: bool) -> None:
+        self.task_durations[name].observe(seconds)
+        self.task_last_run[name] = time.time()
+        if failed:
+            self.task_failures[name] += 1
+
+    async def monitor_loop_lag(self, interval: float = 1.0) -> None:
+        """Measure how late the event loop wakes up from a sleep."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag = max(loop.time() - started - interval, 0.0)
+            self.loop_lag_max = max(self.loop_lag_max, self.loop_lag)
+
+
+def timed_task(func):
+    """Record the duration of a cog's task loop iteration in ``bot.metrics``."""
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await func(self, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.bot.metrics.record_task(
+                func.__qualname__, time.perf_counter() - started, failed
+            )
+
+    return wrapper
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Exposition:
+    """Builds a Prometheus text exposition."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def metric(self, name: str, kind: str, description: str) -> None:
+        self.lines.append(f"# HELP {name} {description}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, **labels) -> None:
+        if labels:
+            label_str = ",".join(
+                f'{key}="{_escape(val)}"' for key, val in labels.items()
+            )
+            name = f"{name}{{{label_str}}}"
+        self.lines.append(f"{name} {value}")
+
+    def histogram(
+        self, name: str, bounds: tuple, buckets: list, total: float, **labels
+    ) -> None:
+        count = 0
+        for bound, bucket in zip(bounds, buckets):
+            count += bucket
+            self.sample(f"{name}_bucket", count, le=bound, **labels)
+        count += buckets[-1]
+        self.sample(f"{name}_bucket", count, le="+Inf", **labels)
+        self.sample(f"{name}_sum", total, **labels)
+        self.sample(f"{name}_count", count, **labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(bot) -> str:
+    """Render the bot's metrics in the Prometheus text format."""
+    out = _Exposition()
+    metrics: Metrics = bot.metrics
+
+    out.metric("ehrenbot_ready", "gauge", "1 if the bot is connected and ready.")
+    out.sample("ehrenbot_ready", int(bot.is_ready() and not bot.is_closed()))
+    out.metric("ehrenbot_event_loop_lag_seconds", "gauge", "Last event loop lag.")
+    out.sample("ehrenbot_event_loop_lag_seconds", metrics.loop_lag)
+    out.metric(
+        "ehrenbot_event_loop_lag_max_seconds", "gauge", "Highest event loop lag."
+    )
+    out.sample("ehrenbot_event_loop_lag_max_seconds", metrics.loop_lag_max)
+    if math.isfinite(bot.latency):
+        out.metric(
+            "ehrenbot_gateway_latency_seconds", "gauge", "Discord heartbeat latency."
+        )
+        out.sample("ehrenbot_gateway_latency_seconds", bot.latency)
+
+    # Task loops
+    out.metric(
+        "ehrenbot_task_duration_seconds", "histogram", "Task loop iteration time."
+    )
+    for task, histogram in sorted(metrics.task_durations.items()):
+        out.histogram(
+            "ehrenbot_task_duration_seconds",
+            histogram.bounds,
+            histogram.buckets,
+            histogram.sum,
+            task=task,
+        )
+    out.metric("ehrenbot_task_failures_total", "counter", "Failed task iterations.")
+    for task, failures in sorted(metrics.task_failures.items()):
+        out.sample("ehrenbot_task_failures_total", failures, task=task)
+    out.metric(
+        "ehrenbot_task_last_run_timestamp_seconds", "gauge", "End of the last run."
+    )
+    for task, last_run in sorted(metrics.task_last_run.items()):
+        out.sample("ehrenbot_task_last_run_timestamp_seconds", last_run, task=task)
+
+    # Bungie API
+    client = bot.destiny_client
+    out.metric(
+        "ehrenbot_bungie_requests_total", "counter", "Bungie requests by ErrorCode."
+    )
+    for (endpoint, code), count in sorted(client.error_codes.items()):
+        out.sample(
+            "ehrenbot_bungie_requests_total", count, endpoint=endpoint, error_code=code
+        )
+    out.metric(
+        "ehrenbot_bungie_request_duration_seconds", "histogram", "Bungie latency."
+    )
+    for endpoint, histogram in sorted(client.latencies.items()):
+        out.histogram(
+            "ehrenbot_bungie_request_duration_seconds",
+            histogram.bounds,
+            histogram.buckets,
+            histogram.sum,
+            endpoint=endpoint,
+        )
+    out.metric("ehrenbot_bungie_retries_total", "counter", "Retried requests.")
+    for endpoint, count in sorted(client.retries.items()):
+        out.sample("ehrenbot_bungie_retries_total", count, endpoint=endpoint)
+    out.metric(
+        "ehrenbot_bungie_rejected_total", "counter", "Requests failed fast (circuit)."
+    )
+    for endpoint, count in sorted(client.rejected.items()):
+        out.sample("ehrenbot_bungie_rejected_total", count, endpoint=endpoint)
+    out.metric(
+        "ehrenbot_bungie_circuit_open", "gauge", "1 while Bungie is in maintenance."
+    )
+    out.sample("ehrenbot_bungie_circuit_open", int(client.breaker.is_open))
+
+    # Bungie response cache and request coalescing
+    cache_stats = client.cache.stats()
+    for name, field, kind in (
+        ("ehrenbot_cache_hits_total", "hits", "counter"),
+        ("ehrenbot_cache_misses_total", "misses", "counter"),
+        ("ehrenbot_cache_hit_ratio", "hit_rate", "gauge"),
+    ):
+        out.metric(name, kind, f"Bungie response cache {field.replace('_', ' ')}.")
+        for endpoint, stat in cache_stats.items():
+            out.sample(name, stat[field], endpoint=endpoint)
+    out.metric("ehrenbot_coalesced_requests_total", "counter", "Deduplicated requests.")
+    for endpoint, stat in client.single_flight.stats().items():
+        out.sample(
+            "ehrenbot_coalesced_requests_total", stat["deduplicated"], endpoint=endpoint
+        )
+
+    # MongoDB calls as seen by the bot, including executor queueing
+    query_stats = bot.database.query_stats
+    for name, values, description in (
+        ("ehrenbot_mongo_calls_total", query_stats.calls, "MongoDB calls."),
+        ("ehrenbot_mongo_call_errors_total", query_stats.errors, "Failed calls."),
+        ("ehrenbot_mongo_call_seconds_total", query_stats.total, "Time in calls."),
+    ):
+        out.metric(name, "counter", description)
+        for collection, operation in sorted(query_stats.calls):
+            out.sample(
+                name,
+                values[(collection, operation)],
+                collection=collection,
+                operation=operation,
+            )
+
+    # MongoDB commands as seen by the driver
+    command_stats = bot.command_monitor.top(limit=None)
+    out.metric(
+        "ehrenbot_mongo_command_duration_seconds", "histogram", "Command latency."
+    )
+    for (collection, operation), stat in command_stats:
+        out.histogram(
+            "ehrenbot_mongo_command_duration_seconds",
+            stat.latency.bounds,
+            stat.latency.buckets,
+            stat.latency.sum,
+            collection=collection,
+            operation=operation,
+        )
+    out.metric(
+        "ehrenbot_mongo_command_documents_total",
+        "counter",
+        "Documents returned, or affected by writes.",
+    )
+    for (collection, operation), stat in command_stats:
+        out.sample(
+            "ehrenbot_mongo_command_documents_total",
+            stat.documents,
+            collection=collection,
+            operation=operation,
+        )
+    return out.render()
@@ -0,0 +1,102 @@
+import logging
+import threading
+from collections import defaultdict
+
+from pymongo import monitoring
+
+from ehrenbot.utils.metrics import Histogram
+
+# Upper bounds of the command latency buckets in seconds
+COMMAND_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def _documents(reply: dict) -> int:
+    """Number of documents a reply returned, or a write reply affected."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    return reply.get("n", 0)
+
+
+class CommandStats:
+    """Latency histogram, failures and documents of one (collection, operation)."""
+
+    def __init__(self) -> None:
+        self.latency = Histogram(COMMAND_BUCKETS)
+        self.failures = 0
+        self.documents = 0
+
+    def record(self, seconds: float, failed: bool, documents: int = 0) -> None:
+        self.latency.observe(seconds)
+        self.documents += documents
+        if failed:
+            self.failures += 1
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """pymongo command listener collecting per collection statistics.
+
+    Listener callbacks run on the driver threads of the database executor,
+    so all bookkeeping happens under a lock. Commands slower than
+    ``slow_ms`` are logged with their filter.
+    """
+
+    def __init__(self, logger: logging.Logger, slow_ms: int) -> None:
+        self.logger = logger
+        self.slow_ms = slow_ms
+        self.stats: defaultdict[tuple[str, str], CommandStats] = defaultdict(
+            CommandStats
+        )
+        self._pending: dict[tuple, tuple[str, str, dict]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event: monitoring.CommandStartedEvent) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore and friends name the collection separately
+        return event.command.get("collection", "$cmd")
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        command = event.command
+        query = command.get("filter", command.get("q", command.get("query")))
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                self._collection(event),
+                event.command_name,
+                query,
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False, documents=_documents(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool, documents: int = 0) -> None:
+        duration_ms = event.duration_micros / 1000
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            collection, operation, query = pending
+            self.stats[(collection, operation)].record(
+                duration_ms / 1000, failed, documents
+            )
+        if duration_ms >= self.slow_ms:
+            self.logger.warning(
+                "Slow query: %s.%s took %.1fms (filter %s)",
+                collection,
+                operation,
+                duration_ms,
+                query,
+            )
+
+    def top(self, limit: int = 10) -> list[tuple[tuple[str, str], CommandStats]]:
+        """Return the operations with the most total time spent, all if
+        ``limit`` is None."""
+        with self._lock:
+            return sorted(
+                self.stats.items(), key=lambda item: item[1].latency.sum, reverse=True
+            )[:limit]
@@ -0,0 +1,177 @@
+import asyncio
+import bisect
+import heapq
+from datetime import datetime, timedelta
+
+from dateutil.parser import parse
+from pymongo import UpdateMany, UpdateOne
+
+from ehrenbot.types import PogoEventDates, PogoEventEmbedData
+from ehrenbot.utils.database import AsyncDatabase
+
+
+def event_dates(event: PogoEventEmbedData) -> PogoEventDates:
+    """Parse the start and end of an event as offset-naive datetimes."""
+    # The feed uses local event times, so the timezone is dropped
+    start = parse(event.start).replace(tzinfo=None)
+    end = parse(event.end).replace(tzinfo=None)
+    return PogoEventDates(eventId=event.eventID, start=start, end=end)
+
+
+class EventIndex:
+    """Pokémon GO events keyed by eventID with sorted start and end times.
+
+    The active and upcoming events are found by bisecting the sorted times
+    instead of scanning every event. Events are upserted by eventID into the
+    ``pogo_events`` collection and loaded from it on startup. Events that
+    dropped out of the feed are kept with ``in_feed`` unset, but only events
+    of the latest feed are indexed by time, so removed or cancelled events
+    leave the boards and the schedule.
+    """
+
+    def __init__(self, database: AsyncDatabase) -> None:
+        self.collection = database["pogo_events"]
+        self.events: dict[str, PogoEventEmbedData] = {}
+        self.dates: dict[str, PogoEventDates] = {}
+        # eventIDs of the latest feed
+        self.current: set[str] = set()
+        self._starts: list[tuple[datetime, str]] = []
+        self._ends: list[tuple[datetime, str]] = []
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    async def load(self) -> None:
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async for entry in self.collection.find({}, {"_id": 0}):
+                start = entry.pop("start_at")
+                end = entry.pop("end_at")
+                in_feed = entry.pop("in_feed", True)
+                event = PogoEventEmbedData(**entry)
+                if in_feed:
+                    self.current.add(event.eventID)
+                self.events[event.eventID] = event
+                self.dates[event.eventID] = PogoEventDates(
+                    eventId=event.eventID, start=start, end=end
+                )
+            self._reindex()
+            self._loaded = True
+
+    async def update(self, events: list[PogoEventEmbedData]) -> int:
+        """Store the events of a feed and return how many were added, changed
+        or removed."""
+        feed = {event.eventID for event in events}
+        changed = [
+            event
+            for event in events
+            if self.events.get(event.eventID) != event
+            or event.eventID not in self.current
+        ]
+        removed = self.current - feed
+        if not changed and not removed:
+            return 0
+        requests = []
+        for event in changed:
+            dates = event_dates(event)
+            self.events[event.eventID] = event
+            self.dates[event.eventID] = dates
+            requests.append(
+                UpdateOne(
+                    {"eventID": event.eventID},
+                    {
+                        "$set": {
+                            **event.model_dump(),
+                            "start_at": dates.start,
+                            "end_at": dates.end,
+                            "in_feed": True,
+                        }
+                    },
+                    upsert=True,
+                )
+            )
+        if removed:
+            requests.append(
+                UpdateMany(
+                    {"eventID": {"$in": sorted(removed)}},
+                    {"$set": {"in_feed": False}},
+                )
+            )
+        await self.collection.bulk_write(requests, ordered=False)
+        self.current = feed
+        self._reindex()
+        return len(changed) + len(removed)
+
+    def _reindex(self) -> None:
+        dates = [self.dates[id_] for id_ in self.current]
+        self._starts = sorted((date.start, date.eventId) for date in dates)
+        self._ends = sorted((date.end, date.eventId) for date in dates)
+
+    def pending(self, now: datetime) -> list[PogoEventDates]:
+        """Dates of the events that have not ended yet."""
+        first = bisect.bisect_right(self._ends, now, key=lambda item: item[0])
+        return [self.dates[id_] for _, id_ in self._ends[first:]]
+
+    def active(self, now: datetime) -> list[PogoEventEmbedData]:
+        """Events with ``start <= now < end``, ordered by start."""
+        running = [dates.eventId for dates in self.pending(now) if dates.start <= now]
+        running.sort(key=lambda id_: (self.dates[id_].start, id_))
+        return [self.events[id_] for id_ in running]
+
+    def upcoming(self, now: datetime, limit: int = 25) -> list[PogoEventEmbedData]:
+        """The next ``limit`` events with ``start > now``, ordered by start."""
+        first = bisect.bisect_right(self._starts, now, key=lambda item: item[0])
+        return [self.events[id_] for _, id_ in self._starts[first : first + limit]]
+
+
+class EventScheduler:
+    """Timer heap of event starts, ends and the reminders before them.
+
+    Entries are ``(due, kind, eventID, minutes)`` where kind is one of
+    ``start``, ``end``, ``start_reminder`` and ``end_reminder`` and minutes is
+    the lead time of a reminder. The heap is rebuilt from the index whenever
+    the feed changes.
+    """
+
+    def __init__(self, start_reminders: list[int], end_reminders: list[int]) -> None:
+        self.start_reminders = start_reminders
+        self.end_reminders = end_reminders
+        self._heap: list[tuple[datetime, str, str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def plan(self, index: EventIndex, now: datetime) -> None:
+        heap = []
+        for dates in index.pending(now):
+            entries = [(dates.start, "start", 0), (dates.end, "end", 0)]
+            entries += [
+                (dates.start - timedelta(minutes=minutes), "start_reminder", minutes)
+                for minutes in self.start_reminders
+            ]
+            entries += [
+                (dates.end - timedelta(minutes=minutes), "end_reminder", minutes)
+                for minutes in self.end_reminders
+            ]
+            heap += [
+                (due, kind, dates.eventId, minutes)
+                for due, kind, minutes in entries
+                if due > now
+            ]
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def next_due(self) -> datetime:
+        """Return the next due time, or ``None`` if nothing is scheduled."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[tuple[str, str, int]]:
+        """Remove and return ``(kind, eventID, minutes)`` of all due entries."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, kind, event_id, minutes = heapq.heappop(self._heap)
+            due.append((kind, event_id, minutes))
+        return due
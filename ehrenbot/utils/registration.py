@@ -1,4 +1,9 @@
+import asyncio
 import json
+import time
+from logging import Logger
+
+from pymongo import UpdateOne
 
 from ehrenbot import Ehrenbot
 from ehrenbot.utils.exceptions import (
@@ -8,23 +13,21 @@ from ehrenbot.utils.exceptions import (
     NoAPIResponse,
     ProfileNotFound,
 )
+from settings import (
+    OAUTH_POLL_INTERVAL,
+    OAUTH_TIMEOUT,
+    PROFILE_REFRESH_BATCH_SIZE,
+    PROFILE_REFRESH_CONCURRENCY,
+)
 
 
 async def check_profile_endpoints(bot: Ehrenbot):
-    collection = bot.database["destiny_tokens"]
-    if collection.count_documents({}) == 0:
-        return
-    admin_token = collection.find_one({"discord_id": bot.ADMIN_DISCORD_ID})["token"]
-    if admin_token is None:
-        return
-    admin_profile = bot.database["members"].find_one(
-        {"discord_id": bot.ADMIN_DISCORD_ID}
-    )["destiny_profile"]
-    if admin_profile is None:
+    account = await bot.service_account.get()
+    if not account.is_available:
         return
     # Check user endpoint
     response = await bot.destiny_client.user.GetMembershipDataForCurrentUser(
-        token=admin_token
+        token=account.token
     )
     if response["ErrorCode"] != 1:
         raise BungieAPIError(
@@ -32,16 +35,16 @@ async def check_profile_endpoints(bot: Ehrenbot):
         )
     # Check destiny2 endpoint
     response = await bot.destiny_client.destiny2.GetProfile(
-        destiny_membership_id=admin_profile["destiny_membership_id"],
-        membership_type=admin_profile["membership_type"],
+        destiny_membership_id=account.destiny_membership_id,
+        membership_type=account.membership_type,
         components=[100],
     )
     if response["ErrorCode"] != 1:
         raise BungieAPIError(f"Could not get profile: {response['ErrorStatus']}")
     # Check group_v2 endpoint
     response = await bot.destiny_client.group_v2.GetGroupsForMember(
-        membership_type=admin_profile["membership_type"],
-        destiny_membership_id=admin_profile["destiny_membership_id"],
+        membership_type=account.membership_type,
+        destiny_membership_id=account.destiny_membership_id,
     )
     if response["ErrorCode"] != 1:
         raise BungieAPIError(
@@ -49,12 +52,16 @@ async def check_profile_endpoints(bot: Ehrenbot):
         )
 
 
+def load_guardian_template() -> dict:
+    with open("data/guardian_template.json", "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
 async def setup_profile(bot: Ehrenbot, discord_id: int, membership_id: int) -> None:
     try:
         profile_collection = bot.database["members"]
-        with open("data/guardian_template.json", "r", encoding="utf-8") as file:
-            guardian_template = json.load(file)
-        profile_collection.update_one(
+        guardian_template = load_guardian_template()
+        await profile_collection.update_one(
             {"discord_id": discord_id},
             {
                 "$set": {
@@ -71,88 +78,110 @@ async def setup_profile(bot: Ehrenbot, discord_id: int, membership_id: int) -> N
         return True
 
 
+async def fetch_profile(
+    bot: Ehrenbot, token: dict, profile: dict, timings: dict = None
+) -> dict:
+    """Fill a destiny profile from the Bungie API.
+
+    GetProfile and GetGroupsForMember only depend on the membership data, so
+    they are requested in parallel. Durations of the two steps are written to
+    ``timings`` if given."""
+    if timings is None:
+        timings = {}
+    start = time.perf_counter()
+    user_endpoints = bot.destiny_client.user
+    response = await user_endpoints.GetMembershipDataForCurrentUser(token=token)
+    if response is None:
+        raise NoAPIResponse
+    if response["ErrorCode"] != 1:
+        raise MembershipDataNotFound(error_status=response["ErrorStatus"])
+    data = response["Response"]
+    profile["destiny_membership_id"] = data["destinyMemberships"][0]["membershipId"]
+    profile["membership_type"] = data["destinyMemberships"][0]["membershipType"]
+    user_data = data["bungieNetUser"]
+    profile["membership_id"] = token["membership_id"]
+    profile["display_name"] = user_data.get("displayName", "")
+    profile["unique_name"] = user_data.get("uniqueName", "")
+    profile["locale"] = user_data.get("locale", "")
+    profile["profile_picture_path"] = user_data.get("profilePicturePath", "")
+    profile["is_deleted"] = user_data.get("isDeleted", True)
+    profile["first_access"] = user_data.get("firstAccess", "")
+    profile["last_update"] = user_data.get("lastUpdate", "")
+    profile["egs_display_name"] = user_data.get("egsDisplayName", "")
+    profile["psn_display_name"] = user_data.get("psnDisplayName", "")
+    profile["xbox_display_name"] = user_data.get("xboxDisplayName", "")
+    profile["blizzard_display_name"] = user_data.get("blizzardDisplayName", "")
+    profile["steam_display_name"] = user_data.get("steamDisplayName", "")
+    profile["stadia_display_name"] = user_data.get("stadiaDisplayName", "")
+    profile["twitch_display_name"] = user_data.get("twitchDisplayName", "")
+    profile["cached_bungie_global_display_name"] = user_data.get(
+        "cachedBungieGlobalDisplayName", ""
+    )
+    profile["cached_bungie_global_display_name_code"] = user_data.get(
+        "cachedBungieGlobalDisplayNameCode", 0
+    )
+    timings["membership"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    profile_response, groups_response = await asyncio.gather(
+        bot.destiny_client.destiny2.GetProfile(
+            destiny_membership_id=profile["destiny_membership_id"],
+            membership_type=profile["membership_type"],
+            components=[100],
+        ),
+        bot.destiny_client.group_v2.GetGroupsForMember(
+            membership_type=profile["membership_type"],
+            destiny_membership_id=profile["destiny_membership_id"],
+        ),
+    )
+    timings["profile_and_groups"] = time.perf_counter() - start
+
+    if profile_response is None:
+        raise NoAPIResponse
+    if profile_response["ErrorCode"] != 1:
+        raise ProfileNotFound(error_status=profile_response["ErrorStatus"])
+    data = profile_response["Response"]["profile"]["data"]
+    profile["cross_save_override"] = data["userInfo"].get("crossSaveOverride", 0)
+    profile["applicable_membership_types"] = data["userInfo"].get(
+        "applicableMembershipTypes", []
+    )
+    profile["is_public"] = data["userInfo"].get("isPublic", False)
+    profile["date_last_played"] = data["dateLastPlayed"]
+    profile["character_ids"] = data["characterIds"]
+
+    if groups_response is None:
+        raise NoAPIResponse
+    if groups_response["ErrorCode"] != 1:
+        raise GroupNotFound(error_status=groups_response["ErrorStatus"])
+    data = groups_response["Response"].get("results")
+    if data:
+        profile["group_id"] = data[0]["member"]["groupId"]
+    return profile
+
+
 async def update_profile(bot: Ehrenbot, discord_id: int) -> bool:
     token_collection = bot.database["destiny_tokens"]
     profile_collection = bot.database["members"]
-    token = token_collection.find_one({"discord_id": discord_id})["token"]
+    token = (await token_collection.find_one({"discord_id": discord_id}))["token"]
     if not token:
         bot.logger.error("Could not find token for %d", discord_id)
         return False
-    profile = profile_collection.find_one({"discord_id": discord_id})["destiny_profile"]
+    member = await profile_collection.find_one({"discord_id": discord_id}) or {}
+    profile = member.get("destiny_profile")
     if not profile:
         bot.logger.error(
             "Could not find profile for %d, creating new profile...", discord_id
         )
         await setup_profile(bot, discord_id, token["membership_id"])
+        profile = load_guardian_template()
 
     try:
-        user_endpoints = bot.destiny_client.user
-        response = await user_endpoints.GetMembershipDataForCurrentUser(token=token)
-        if response is None:
-            raise NoAPIResponse
-        if response["ErrorCode"] != 1:
-            raise MembershipDataNotFound(error_status=response["ErrorStatus"])
-        data = response["Response"]
-        profile["destiny_membership_id"] = data["destinyMemberships"][0]["membershipId"]
-        profile["membership_type"] = data["destinyMemberships"][0]["membershipType"]
-        user_data = data["bungieNetUser"]
-        profile["membership_id"] = token["membership_id"]
-        profile["display_name"] = user_data.get("displayName", "")
-        profile["unique_name"] = user_data.get("uniqueName", "")
-        profile["locale"] = user_data.get("locale", "")
-        profile["profile_picture_path"] = user_data.get("profilePicturePath", "")
-        profile["is_deleted"] = user_data.get("isDeleted", True)
-        profile["first_access"] = user_data.get("firstAccess", "")
-        profile["last_update"] = user_data.get("lastUpdate", "")
-        profile["egs_display_name"] = user_data.get("egsDisplayName", "")
-        profile["psn_display_name"] = user_data.get("psnDisplayName", "")
-        profile["xbox_display_name"] = user_data.get("xboxDisplayName", "")
-        profile["blizzard_display_name"] = user_data.get("blizzardDisplayName", "")
-        profile["steam_display_name"] = user_data.get("steamDisplayName", "")
-        profile["stadia_display_name"] = user_data.get("stadiaDisplayName", "")
-        profile["twitch_display_name"] = user_data.get("twitchDisplayName", "")
-        profile["cached_bungie_global_display_name"] = user_data.get(
-            "cachedBungieGlobalDisplayName", ""
-        )
-        profile["cached_bungie_global_display_name_code"] = user_data.get(
-            "cachedBungieGlobalDisplayNameCode", 0
-        )
-
-        destiny2_endpoints = bot.destiny_client.destiny2
-        response = await destiny2_endpoints.GetProfile(
-            destiny_membership_id=profile["destiny_membership_id"],
-            membership_type=profile["membership_type"],
-            components=[100],
-        )
-        if response is None:
-            raise NoAPIResponse
-        if response["ErrorCode"] != 1:
-            raise ProfileNotFound(error_status=response["ErrorStatus"])
-        data = response["Response"]["profile"]["data"]
-        profile["cross_save_override"] = data["userInfo"].get("crossSaveOverride", 0)
-        profile["applicable_membership_types"] = data["userInfo"].get(
-            "applicableMembershipTypes", []
-        )
-        profile["is_public"] = data["userInfo"].get("isPublic", False)
-        profile["date_last_played"] = data["dateLastPlayed"]
-        profile["character_ids"] = data["characterIds"]
-
-        group_v2_endpoints = bot.destiny_client.group_v2
-        response = await group_v2_endpoints.GetGroupsForMember(
-            membership_type=profile["membership_type"],
-            destiny_membership_id=profile["destiny_membership_id"],
-        )
-        if response is None:
-            raise NoAPIResponse
-        if response["ErrorCode"] != 1:
-            raise GroupNotFound(error_status=response["ErrorStatus"])
-        data = response["Response"].get("results")
-        if data:
-            profile["group_id"] = data[0]["member"]["groupId"]
-
-        profile_collection.update_one(
+        profile = await fetch_profile(bot, token, profile)
+        await profile_collection.update_one(
             {"discord_id": discord_id}, {"$set": {"destiny_profile": profile}}
         )
+        if discord_id == bot.service_account.discord_id:
+            bot.service_account.update_profile(profile)
         bungie_name = profile["unique_name"]
         bot.logger.info("%s has been updated successfully!", bungie_name)
         return True
@@ -162,5 +191,122 @@ async def update_profile(bot: Ehrenbot, discord_id: int) -> bool:
         return False
 
 
+async def refresh_profiles(
+    bot: Ehrenbot, logger: Logger, discord_ids: list[int] = None
+) -> int:
+    """Refresh the destiny profiles of all registered members.
+
+    Members are fetched concurrently under PROFILE_REFRESH_CONCURRENCY and
+    written with bulk writes of PROFILE_REFRESH_BATCH_SIZE. Returns the number
+    of updated profiles."""
+    started = time.perf_counter()
+    token_collection = bot.database["destiny_tokens"]
+    profile_collection = bot.database["members"]
+    query = {"discord_id": {"$in": discord_ids}} if discord_ids else {}
+    tokens = await token_collection.find(query, {"discord_id": 1, "token": 1}).to_list()
+    members = {
+        member["discord_id"]: member.get("destiny_profile")
+        async for member in profile_collection.find(
+            {"discord_id": {"$in": [token["discord_id"] for token in tokens]}},
+            {"discord_id": 1, "destiny_profile": 1},
+        )
+    }
+    load_time = time.perf_counter() - started
+
+    semaphore = asyncio.Semaphore(PROFILE_REFRESH_CONCURRENCY)
+    step_times = {"membership": [], "profile_and_groups": [], "write": []}
+    requests = []
+    updated = 0
+
+    async def flush() -> None:
+        nonlocal updated
+        batch = requests.copy()
+        requests.clear()
+        start = time.perf_counter()
+        result = await profile_collection.bulk_write(batch, ordered=False)
+        step_times["write"].append(time.perf_counter() - start)
+        updated += result.matched_count
+
+    async def refresh(entry: dict) -> None:
+        discord_id = entry["discord_id"]
+        if discord_id not in members:
+            return
+        token = entry["token"]
+        profile = members[discord_id] or load_guardian_template()
+        timings = {}
+        try:
+            async with semaphore:
+                profile = await fetch_profile(bot, token, profile, timings)
+        except Exception as ex:
+            logger.error("Could not update profile for %d: %s", discord_id, ex)
+            return
+        finally:
+            for step, duration in timings.items():
+                step_times[step].append(duration)
+        if discord_id == bot.service_account.discord_id:
+            bot.service_account.update_profile(profile)
+        requests.append(
+            UpdateOne(
+                {"discord_id": discord_id},
+                {
+                    "$set": {
+                        "destiny_profile": profile,
+                        "membership_id": token["membership_id"],
+                    }
+                },
+            )
+        )
+        if len(requests) >= PROFILE_REFRESH_BATCH_SIZE:
+            await flush()
+
+    await asyncio.gather(*(refresh(entry) for entry in tokens))
+    if requests:
+        await flush()
+
+    summary = ", ".join(
+        f"{step} total {sum(times):.2f}s max {max(times, default=0):.2f}s"
+        for step, times in step_times.items()
+    )
+    logger.info(
+        "Refreshed %d/%d profiles in %.2fs (load %.2fs, %s)",
+        updated,
+        len(tokens),
+        time.perf_counter() - started,
+        load_time,
+        summary,
+    )
+    return updated
+
+
+async def wait_for_token(
+    bot: Ehrenbot, state: str, discord_id: int, future: asyncio.Future
+) -> dict:
+    """Wait until the OAuth callback for a state stored the token.
+
+    The callback resolves the future in-process. If OAUTH_POLL_INTERVAL is
+    set, the token collection is also polled at that interval in case the
+    callback was handled by another process."""
+    token_collection = bot.database["destiny_tokens"]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + OAUTH_TIMEOUT
+    try:
+        if token := await token_collection.find_one({"discord_id": discord_id}):
+            return token
+        while (remaining := deadline - loop.time()) > 0:
+            timeout = min(OAUTH_POLL_INTERVAL or remaining, remaining)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                if OAUTH_POLL_INTERVAL:
+                    if token := await token_collection.find_one(
+                        {"discord_id": discord_id}
+                    ):
+                        return token
+        return None
+    finally:
+        bot.pending_registrations.pop(state, None)
+        future.cancel()
+
+
 async def register_user() -> bool:
     return True
@@ -0,0 +1,95 @@
+from logging import Logger
+
+from ehrenbot import Ehrenbot
+
+
+async def probe_date_last_played(bot: Ehrenbot, destiny_profile: dict) -> str:
+    """Fetch dateLastPlayed with a cheap component 100 request."""
+    response = await bot.destiny_client.destiny2.GetProfile(
+        destiny_membership_id=destiny_profile["destiny_membership_id"],
+        membership_type=destiny_profile["membership_type"],
+        components=[100],
+    )
+    if not response or response.get("ErrorCode") != 1:
+        return ""
+    return response["Response"]["profile"]["data"]["dateLastPlayed"]
+
+
+async def fetch_not_acquired_items(bot: Ehrenbot, destiny_profile: dict) -> list:
+    """Fetch the full collectibles payload and return the not acquired item hashes."""
+    response = await bot.destiny_client.destiny2.GetProfile(
+        destiny_membership_id=destiny_profile["destiny_membership_id"],
+        membership_type=destiny_profile["membership_type"],
+        components=[800],
+    )
+    collectibles = response["Response"]["profileCollectibles"]["data"]["collectibles"]
+
+    # Get all not acquired collectibles
+    not_acquired = [
+        int(collectible)
+        for collectible in collectibles
+        if collectibles[collectible]["state"] % 2 == 1
+    ]
+
+    # Convert to itemHashes
+    item_hashes = set()
+    for collectible in not_acquired:
+        response = await bot.destiny_client.decode_hash(
+            collectible, "DestinyCollectibleDefinition"
+        )
+        item_hashes.add(response["itemHash"])
+    return sorted(item_hashes)
+
+
+async def filter_shaders(bot: Ehrenbot, item_hashes: list) -> set:
+    """Return the item hashes that are known shaders."""
+    shaders = bot.database["destiny_shaders"]
+    return {
+        shader["hash"]
+        async for shader in shaders.find(
+            {"hash": {"$in": item_hashes}}, {"hash": 1, "_id": 0}
+        )
+    }
+
+
+async def get_not_acquired_shaders(bot: Ehrenbot, logger: Logger, member: dict) -> set:
+    """Return the shader hashes a member has not acquired yet.
+
+    The result is cached on the member document together with the
+    dateLastPlayed and the shader catalog size it was computed for. The
+    component 800 payload is only fetched again when the member played
+    since the snapshot was taken or shaders were added to the catalog."""
+    discord_id = member["discord_id"]
+    destiny_profile = member["destiny_profile"]
+    # Shaders are only ever added, so the count versions the catalog
+    shader_count = await bot.database["destiny_shaders"].count_documents({})
+    cache = member.get("collectibles")
+    if cache and cache.get("shader_count") != shader_count:
+        cache = None
+    date_last_played = await probe_date_last_played(bot, destiny_profile)
+    if cache and cache["date_last_played"] == date_last_played:
+        logger.debug("Using cached collectibles for %d", discord_id)
+        return set(cache["not_acquired_shaders"])
+    if not date_last_played:
+        logger.warning("Could not probe dateLastPlayed for %d", discord_id)
+        if cache:
+            return set(cache["not_acquired_shaders"])
+
+    not_acquired_items = await fetch_not_acquired_items(bot, destiny_profile)
+    not_acquired_shaders = await filter_shaders(bot, not_acquired_items)
+    if date_last_played:
+        await bot.database["members"].update_one(
+            {"discord_id": discord_id},
+            {
+                "$set": {
+                    "collectibles": {
+                        "date_last_played": date_last_played,
+                        "shader_count": shader_count,
+                        "not_acquired_shaders": sorted(not_acquired_shaders),
+                    },
+                    "destiny_profile.date_last_played": date_last_played,
+                }
+            },
+        )
+        logger.debug("Refreshed collectibles cache for %d", discord_id)
+    return not_acquired_shaders
@@ -134,7 +134,7 @@ async def vendor_embed(bot: Ehrenbot, vendor_hash: int) -> discord.Embed:
 
 
 async def weapon_embed_field(bot: Ehrenbot, vendor_hash: int) -> str:
-    daily_rotation = bot.database["destiny_rotation"].find_one(
+    daily_rotation = await bot.database["destiny_rotation"].find_one(
         {"vendor_hash": vendor_hash}
     )
     weapons = daily_rotation["weapons"]
@@ -179,7 +179,7 @@ async def weapon_sockets_field(bot: Ehrenbot, weapon: dict):
 
 
 async def armor_embed_field(bot: Ehrenbot, vendor_hash: int, category: str) -> str:
-    daily_rotation = bot.database["destiny_rotation"].find_one(
+    daily_rotation = await bot.database["destiny_rotation"].find_one(
         {"vendor_hash": vendor_hash}
     )
     armor = daily_rotation["armor"]
@@ -209,7 +209,7 @@ async def armor_embed_field(bot: Ehrenbot, vendor_hash: int, category: str) -> s
 
 
 async def shader_embed_field(bot: Ehrenbot, vendor_hash: int) -> str:
-    daily_rotation = bot.database["destiny_rotation"].find_one(
+    daily_rotation = await bot.database["destiny_rotation"].find_one(
         {"vendor_hash": vendor_hash}
     )
     shaders = daily_rotation["shaders"]
@@ -16,12 +16,12 @@ async def fetch_vendor_sales(bot: Ehrenbot, logger: Logger, vendor_hash: int) ->
     try:
         current_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
         destiny_rotation = bot.database["destiny_rotation"]
-        if entry := destiny_rotation.find_one({"vendor_hash": vendor_hash}):
+        if entry := await destiny_rotation.find_one({"vendor_hash": vendor_hash}):
             date_str = entry.get("date")
             if date_str == current_date:
                 logger.info("Vendor rotation already in database")
                 return True
-        destiny_rotation.update_one(
+        await destiny_rotation.update_one(
             {"vendor_hash": vendor_hash},
             {"$set": {"armor": [], "weapons": []}},
             upsert=True,
@@ -160,32 +160,32 @@ async def process_vendor_sales(
         return False
     else:
         destiny_rotation = bot.database["destiny_rotation"]
-        destiny_rotation.update_one(
+        await destiny_rotation.update_one(
             {"vendor_hash": vendor_hash},
             {"$set": {"vendor": data["vendor"]["data"]}},
             upsert=True,
         )
         if armor:
-            destiny_rotation.update_one(
+            await destiny_rotation.update_one(
                 {"vendor_hash": vendor_hash}, {"$set": {"armor": armor}}, upsert=True
             )
         if weapons:
-            destiny_rotation.update_one(
+            await destiny_rotation.update_one(
                 {"vendor_hash": vendor_hash},
                 {"$set": {"weapons": weapons}},
                 upsert=True,
             )
         if mods:
-            destiny_rotation.update_one(
+            await destiny_rotation.update_one(
                 {"vendor_hash": vendor_hash}, {"$set": {"mods": mods}}, upsert=True
             )
         if shaders:
-            destiny_rotation.update_one(
+            await destiny_rotation.update_one(
                 {"vendor_hash": vendor_hash},
                 {"$set": {"shaders": shaders}},
                 upsert=True,
             )
-        destiny_rotation.update_one(
+        await destiny_rotation.update_one(
             {"vendor_hash": vendor_hash},
             {
                 "$set": {
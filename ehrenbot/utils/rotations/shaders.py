@@ -3,6 +3,7 @@ from logging import Logger
 import discord
 
 from ehrenbot import Ehrenbot
+from .collectibles import get_not_acquired_shaders
 from .embeds import create_emoji_from_entry
 
 
@@ -13,7 +14,7 @@ async def get_missing_shaders(bot: Ehrenbot, logger: Logger, discord_id: int) ->
 
         # Get all collectibles
         profile_collection = bot.database["members"]
-        profile = profile_collection.find_one({"discord_id": discord_id})
+        profile = await profile_collection.find_one({"discord_id": discord_id})
         if not profile:
             logger.info(
                 "No profile found for %d (%s). Removing from list",
@@ -28,47 +29,18 @@ async def get_missing_shaders(bot: Ehrenbot, logger: Logger, discord_id: int) ->
                 member.name,
             )
             return "No profile found for this user."
-        response = await bot.destiny_client.destiny2.GetProfile(
-            destiny_membership_id=profile["destiny_profile"]["destiny_membership_id"],
-            membership_type=profile["destiny_profile"]["membership_type"],
-            components=[800],
+        missing_shader = await get_not_acquired_shaders(
+            bot=bot, logger=logger, member=profile
         )
-        collectibles = response["Response"]["profileCollectibles"]["data"][
-            "collectibles"
-        ]
-        not_acquired = []
-
-        # Get all not acquired collectibles
-        not_acquired = [
-            int(collectible)
-            for collectible in collectibles
-            if collectibles[collectible]["state"] % 2 == 1
-        ]
-
-        # Convert to itemHashes and filter out shaders
-        item_hashes = []
-        shaders = bot.database["destiny_shaders"]
-        for collectible in not_acquired:
-            response = await bot.destiny_client.decode_hash(
-                collectible, "DestinyCollectibleDefinition"
-            )
-            item_hash = response["itemHash"]
-            item_hashes.append(item_hash)
-
-        # Get all shaders
-        missing_shader = []
-        for shader in shaders.find():
-            if shader["hash"] in item_hashes:
-                missing_shader.append(shader["hash"])
         if not missing_shader:
             logger.info("No missing shaders for %d (%s)", discord_id, member.name)
             return "You have all shaders!"
 
         # Get available shaders
         rotation_collection = bot.database["destiny_rotation"]
-        sold_shaders = rotation_collection.find_one({"vendor_hash": 350061650})[
-            "shaders"
-        ]
+        sold_shaders = (
+            await rotation_collection.find_one({"vendor_hash": 350061650})
+        )["shaders"]
         final = []
         for shader in sold_shaders:
             if int(shader) in missing_shader:
@@ -4,6 +4,7 @@ from logging import Logger
 import discord
 
 from ehrenbot import Ehrenbot
+from ehrenbot.utils.subscriptions import SHADER_NOTIFICATIONS
 from .embeds import vendor_embed
 from .item_processing import fetch_vendor_sales
 from .shaders import get_missing_shaders
@@ -22,7 +23,7 @@ async def vendor_rotations(bot: Ehrenbot, logger: Logger, vendor_hash: int):
     if not await fetch_vendor_sales(bot=bot, logger=logger, vendor_hash=vendor_hash):
         logger.error("Failed to fetch vendor sales for vendor %s", vendor_hash)
         return
-    entry = rotation_collection.find_one({"vendor_hash": vendor_hash})
+    entry = await rotation_collection.find_one({"vendor_hash": vendor_hash})
     embed = await vendor_embed(bot=bot, vendor_hash=vendor_hash)
     if _id := entry.get("message_id"):
         message = await channel.fetch_message(_id)
@@ -30,7 +31,7 @@ async def vendor_rotations(bot: Ehrenbot, logger: Logger, vendor_hash: int):
     else:
         await channel.send(content="", embed=embed)
         _id = channel.last_message_id
-        rotation_collection.update_one(
+        await rotation_collection.update_one(
             {"vendor_hash": vendor_hash}, {"$set": {"message_id": _id}}, upsert=True
         )
     logger.debug("Sent embed for vendor %s", vendor_hash)
@@ -41,19 +42,18 @@ async def vendor_rotations(bot: Ehrenbot, logger: Logger, vendor_hash: int):
         reset_date = entry["vendor"]["nextRefreshDate"]
         # Parse reset date
         reset_date = datetime.datetime.strptime(reset_date, "%Y-%m-%dT%H:%M:%SZ")
-        with open("data/notify-shaders.csv", "r", encoding="utf-8") as file:
-            notify_shaders = file.read().splitlines()
+        notify_shaders = sorted(await bot.subscriptions.members(SHADER_NOTIFICATIONS))
         for member_id in notify_shaders:
             # Check if member is in Main server
             member = await bot.fetch_user(member_id)
             if member.mutual_guilds == [] or member is None:
-                notify_shaders.remove(member_id)
+                await bot.subscriptions.unsubscribe(SHADER_NOTIFICATIONS, member_id)
                 continue
             missing_shaders = await get_missing_shaders(
-                bot=bot, logger=logger, discord_id=int(member_id)
+                bot=bot, logger=logger, discord_id=member_id
             )
             if missing_shaders == "No profile found for this user.":
-                notify_shaders.remove(member_id)
+                await bot.subscriptions.unsubscribe(SHADER_NOTIFICATIONS, member_id)
                 continue
             if missing_shaders == "You have all shaders!":
                 continue  # Placeholder
@@ -70,9 +70,4 @@ async def vendor_rotations(bot: Ehrenbot, logger: Logger, vendor_hash: int):
             )
             logger.debug("Sent notification to %s (%s).", member_id, member.name)
 
-        # Update notify-mods.csv
-        with open("data/notify-shaders.csv", "w", encoding="utf-8") as file:
-            for member_id in notify_shaders:
-                file.write(f"{member_id}\n")
-
         logger.info("Vendor rotation complete!")
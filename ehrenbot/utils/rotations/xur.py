@@ -30,21 +30,21 @@ async def xur_rotation(bot: Ehrenbot, logger: logging.Logger):
         text=f"Last updated: {current_time.strftime('%Y-%m-%d %H:%M:%S')} UTC"
     )
 
-    entry = rotation_collection.find_one({"vendor_hash": vendor_hash})
+    entry = await rotation_collection.find_one({"vendor_hash": vendor_hash})
     if _id := entry.get("message_id"):
         message = await channel.fetch_message(_id)
         await message.edit(content="", embed=embed)
     else:
         await channel.send(content="", embed=embed)
         _id = channel.last_message_id
-        rotation_collection.update_one(
+        await rotation_collection.update_one(
             {"vendor_hash": vendor_hash}, {"$set": {"message_id": _id}}, upsert=True
         )
     logger.debug("Sent embed for vendor %s", vendor_hash)
 
 
 async def xur_embed(bot: Ehrenbot) -> discord.Embed:
-    xur = bot.database["destiny_rotation"].find_one({"vendor_hash": 2190858386})
+    xur = await bot.database["destiny_rotation"].find_one({"vendor_hash": 2190858386})
     vendor_location_index = xur["vendor"]["vendorLocationIndex"]
     vendor_locations = {
         0: "The Last City, Tower",
@@ -101,7 +101,7 @@ async def xur_embed(bot: Ehrenbot) -> discord.Embed:
 async def exotic_item_embed_field(
     bot: Ehrenbot, vendor_hash: int, item_type: str
 ) -> str:
-    daily_rotation = bot.database["destiny_rotation"].find_one(
+    daily_rotation = await bot.database["destiny_rotation"].find_one(
         {"vendor_hash": vendor_hash}
     )
     items = daily_rotation[item_type]
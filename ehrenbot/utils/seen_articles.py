@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from ehrenbot.utils.database import AsyncDatabase
+
+
+class SeenArticles:
+    """PokeBattler articles already posted, as ``(channel_id, url)`` pairs.
+
+    Pairs are stored in the ``pokebattler_seen`` collection with a unique
+    index and loaded once into a set, so deciding whether to post an article
+    never touches the channel history. Entries expire through a TTL index
+    on ``seen_at`` long after the article left the fetched pages.
+
+    Channels without any entry are scanned once through ``add_many`` by the
+    cog, so articles posted before the collection existed are not posted
+    again.
+    """
+
+    def __init__(self, database: AsyncDatabase) -> None:
+        self.collection = database["pokebattler_seen"]
+        self._seen: set[tuple[int, str]] = None
+        # Channels with entries or a finished history scan
+        self._channels: set[int] = set()
+        self._load_lock = asyncio.Lock()
+
+    async def _load(self) -> set[tuple[int, str]]:
+        async with self._load_lock:
+            if self._seen is None:
+                entries = await self.collection.find(
+                    {}, {"channel_id": 1, "url": 1, "_id": 0}
+                ).to_list()
+                self._seen = {(entry["channel_id"], entry["url"]) for entry in entries}
+                self._channels = {channel_id for channel_id, _ in self._seen}
+        return self._seen
+
+    async def _store(self, pairs: set[tuple[int, str]]) -> None:
+        pairs -= self._seen
+        if pairs:
+            now = datetime.now(timezone.utc)
+            await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"channel_id": channel_id, "url": url},
+                        {"$setOnInsert": {"seen_at": now}},
+                        upsert=True,
+                    )
+                    for channel_id, url in pairs
+                ],
+                ordered=False,
+            )
+            self._seen |= pairs
+        self._channels |= {channel_id for channel_id, _ in pairs}
+
+    async def is_seen(self, channel_id: int, url: str) -> bool:
+        return (channel_id, url) in await self._load()
+
+    async def is_known_channel(self, channel_id: int) -> bool:
+        """False until the channel has an entry or was scanned."""
+        await self._load()
+        return channel_id in self._channels
+
+    async def add_many(self, channel_id: int, urls: list[str]) -> None:
+        """Mark articles as posted in a channel and the channel as known."""
+        await self._load()
+        await self._store({(channel_id, url) for url in urls})
+        self._channels.add(channel_id)
+
+    async def add(self, channel_id: int, url: str) -> None:
+        await self.add_many(channel_id, [url])
@@ -0,0 +1,49 @@
+from pymongo import DESCENDING, ReturnDocument
+
+from ehrenbot.utils.database import AsyncDatabase
+
+
+class Sequence:
+    """Monotonic id allocator backed by a document in ``counters``.
+
+    Every id is handed out by one atomic ``$inc``, so concurrent callers
+    never get the same value. On first use the counter is raised to the
+    current maximum of ``field`` in ``collection`` so existing documents
+    keep their ids.
+    """
+
+    def __init__(
+        self, database: AsyncDatabase, name: str, collection: str, field: str
+    ) -> None:
+        self.counters = database["counters"]
+        self.collection = database[collection]
+        self.name = name
+        self.field = field
+        self._seeded = False
+
+    async def seed(self) -> None:
+        latest = (
+            await self.collection.find(
+                {self.field: {"$type": "number"}}, {self.field: 1, "_id": 0}
+            )
+            .sort(self.field, DESCENDING)
+            .to_list(1)
+        )
+        current = latest[0][self.field] if latest else 0
+        # $max never lowers the counter, so concurrent seeding is harmless
+        await self.counters.update_one(
+            {"_id": self.name}, {"$max": {"value": current}}, upsert=True
+        )
+        self._seeded = True
+
+    async def next(self) -> int:
+        """Allocate the next id."""
+        if not self._seeded:
+            await self.seed()
+        counter = await self.counters.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["value"]
@@ -0,0 +1,53 @@
+from ehrenbot.utils.database import AsyncDatabase
+
+
+class ServiceAccount:
+    """Admin token and Destiny profile shared by all system jobs.
+
+    Rotations, status checks and endpoint checks all act as the admin. The
+    context is read from ``destiny_tokens`` and ``members`` once and then
+    kept up to date by the token scheduler and profile updates.
+    """
+
+    def __init__(self, database: AsyncDatabase, discord_id: int) -> None:
+        self.database = database
+        self.discord_id = discord_id
+        self.token: dict = None
+        self.destiny_membership_id: int = None
+        self.membership_type: int = None
+        self.character_ids: list = []
+        self._loaded = False
+
+    @property
+    def is_available(self) -> bool:
+        return bool(self.token) and bool(self.destiny_membership_id)
+
+    @property
+    def character_id(self) -> int:
+        return self.character_ids[0]
+
+    async def get(self) -> "ServiceAccount":
+        """Return the context, loading it on first use."""
+        if not self._loaded:
+            await self.load()
+        return self
+
+    async def load(self) -> None:
+        entry = await self.database["destiny_tokens"].find_one(
+            {"discord_id": self.discord_id}, {"token": 1}
+        )
+        self.token = entry["token"] if entry else None
+        member = await self.database["members"].find_one(
+            {"discord_id": self.discord_id}, {"destiny_profile": 1}
+        )
+        self.update_profile(member.get("destiny_profile") if member else None)
+        self._loaded = True
+
+    def update_token(self, token: dict) -> None:
+        self.token = token
+
+    def update_profile(self, profile: dict) -> None:
+        profile = profile or {}
+        self.destiny_membership_id = profile.get("destiny_membership_id")
+        self.membership_type = profile.get("membership_type")
+        self.character_ids = profile.get("character_ids", [])
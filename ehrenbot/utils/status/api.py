@@ -3,9 +3,9 @@ from ehrenbot import Ehrenbot
 from .status import update_status
 
 
-async def check_api_status(bot: Ehrenbot) -> bool:
+async def check_api_status(bot: Ehrenbot) -> dict:
     """Check if the Bungie API is online."""
-    destiny2 = bot.destiny_client.destiny2
+    destiny2 = bot.destiny_client.fresh("destiny2")
     status = {
         "Status": "**ERROR**",
         "Category": "API",
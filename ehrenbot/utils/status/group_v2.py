@@ -3,9 +3,9 @@ from ehrenbot import Ehrenbot
 from .status import update_status
 
 
-async def check_group_v2_status(bot: Ehrenbot, group_id: int) -> bool:
+async def check_group_v2_status(bot: Ehrenbot, group_id: int) -> dict:
     """Check if the GroupV2 endpoints are online."""
-    group_v2 = bot.destiny_client.group_v2
+    group_v2 = bot.destiny_client.fresh("group_v2")
     status = {
         "Status": "**ERROR**",
         "Category": "GroupV2",
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from ehrenbot.utils.database import AsyncDatabase
+
+
+async def run_probe(
+    category: str, endpoint: str, probe, timeout: float, logger: logging.Logger
+) -> dict:
+    """Await a status probe with a timeout and attach its latency."""
+    started = time.perf_counter()
+    try:
+        status = await asyncio.wait_for(probe, timeout)
+    except asyncio.TimeoutError:
+        status = {"Status": "🔴 **Timeout**", "Outcome": "timeout"}
+    except Exception:
+        logger.exception("Status probe %s failed", category)
+        status = {"Status": "**ERROR**", "Outcome": "error"}
+    status.setdefault("Category", category)
+    status.setdefault("Used Endpoint", f"`{endpoint}`")
+    status["Latency"] = time.perf_counter() - started
+    return status
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class StatusHistory:
+    """Probe results in the capped ``api_status_history`` collection."""
+
+    def __init__(self, database: AsyncDatabase) -> None:
+        self.collection = database["api_status_history"]
+
+    async def record(self, statuses: list[dict]) -> None:
+        now = datetime.now(timezone.utc)
+        await self.collection.insert_many(
+            [
+                {
+                    "timestamp": now,
+                    "category": status["Category"],
+                    "outcome": status.get("Outcome", "error"),
+                    "latency": status["Latency"],
+                }
+                for status in statuses
+            ]
+        )
+
+    async def summary(self, hours: int = 24) -> dict[str, dict]:
+        """Return p50/p95 latency and availability per category."""
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        entries = await self.collection.find(
+            {"timestamp": {"$gte": since}}, {"_id": 0, "timestamp": 0}
+        ).to_list()
+        latencies = defaultdict(list)
+        online = defaultdict(int)
+        total = defaultdict(int)
+        for entry in entries:
+            category = entry["category"]
+            total[category] += 1
+            if entry["outcome"] == "online":
+                online[category] += 1
+                latencies[category].append(entry["latency"])
+        summary = {}
+        for category, count in total.items():
+            values = sorted(latencies[category])
+            summary[category] = {
+                "p50": percentile(values, 0.5) if values else None,
+                "p95": percentile(values, 0.95) if values else None,
+                "availability": online[category] / count,
+            }
+        return summary
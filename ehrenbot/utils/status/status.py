@@ -1,10 +1,18 @@
+from ehrenbot.utils.bungie import is_maintenance
+
+
 def update_status(response: dict, status: dict) -> dict:
     """Update the status based on the response."""
     if response is None:
         status["Status"] = "🔴 **Offline**"
+        status["Outcome"] = "offline"
         return status
-    if response.get("ErrorCode") == 5:
+    if is_maintenance(response):
         status["Status"] = "🟡 **Maintenance**"
+        status["Outcome"] = "maintenance"
     elif response.get("ErrorCode") == 1:
         status["Status"] = "🟢 **Online**"
+        status["Outcome"] = "online"
+    else:
+        status["Outcome"] = "error"
     return status
@@ -5,9 +5,9 @@ from .status import update_status
 
 async def check_user_status(
     bot: Ehrenbot, destiny_membership_id: int, membership_type: int
-) -> bool:
+) -> dict:
     """Check if User endpoints are online."""
-    destiny2 = bot.destiny_client.destiny2
+    destiny2 = bot.destiny_client.fresh("destiny2")
     status = {
         "Status": "**ERROR**",
         "Category": "User",
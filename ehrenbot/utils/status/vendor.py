@@ -9,9 +9,9 @@ async def check_vendor_status(
     membership_type: int,
     character_id: int,
     token: dict,
-) -> bool:
+) -> dict:
     """Check if the Vendor endpoints are online."""
-    destiny2 = bot.destiny_client.destiny2
+    destiny2 = bot.destiny_client.fresh("destiny2")
     status = {
         "Status": "**ERROR**",
         "Category": "Vendor",
@@ -0,0 +1,100 @@
+import asyncio
+import csv
+import logging
+import os
+
+from pymongo import UpdateOne
+
+from ehrenbot.utils.database import AsyncDatabase
+
+SHADER_NOTIFICATIONS = "shaders"
+
+
+def _read_csv_ids(path: str) -> set[int]:
+    with open(path, "r", encoding="utf-8") as file:
+        return {int(row[0]) for row in csv.reader(file) if row}
+
+
+class SubscriptionStore:
+    """Per-topic notification subscriptions.
+
+    Every subscription is one ``(topic, discord_id)`` document in the
+    ``subscriptions`` collection. Topic members are loaded once and kept in
+    memory, so lookups, subscribes and unsubscribes never scan the whole set.
+    """
+
+    def __init__(self, database: AsyncDatabase, logger: logging.Logger) -> None:
+        self.collection = database["subscriptions"]
+        self.logger = logger
+        self._topics: dict[str, set[int]] = {}
+
+    async def members(self, topic: str) -> set[int]:
+        """Return the discord ids subscribed to a topic."""
+        if topic not in self._topics:
+            entries = await self.collection.find(
+                {"topic": topic}, {"discord_id": 1, "_id": 0}
+            ).to_list()
+            self._topics[topic] = {entry["discord_id"] for entry in entries}
+        return self._topics[topic]
+
+    async def subscribe(self, topic: str, discord_id: int) -> None:
+        members = await self.members(topic)
+        if discord_id in members:
+            return
+        await self.collection.update_one(
+            {"topic": topic, "discord_id": discord_id},
+            {"$setOnInsert": {"topic": topic, "discord_id": discord_id}},
+            upsert=True,
+        )
+        members.add(discord_id)
+
+    async def unsubscribe(self, topic: str, discord_id: int) -> None:
+        members = await self.members(topic)
+        if discord_id not in members:
+            return
+        await self.collection.delete_one({"topic": topic, "discord_id": discord_id})
+        members.discard(discord_id)
+
+    async def unsubscribe_all(self, discord_id: int) -> None:
+        """Remove a user from every topic, e.g. when they leave the server."""
+        await self.collection.delete_many({"discord_id": discord_id})
+        for members in self._topics.values():
+            members.discard(discord_id)
+
+    async def replace(self, topic: str, discord_ids: set[int]) -> None:
+        """Set the members of a topic to exactly the given discord ids."""
+        members = await self.members(topic)
+        removed = members - discord_ids
+        added = discord_ids - members
+        if removed:
+            await self.collection.delete_many(
+                {"topic": topic, "discord_id": {"$in": list(removed)}}
+            )
+        if added:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"topic": topic, "discord_id": discord_id},
+                        {"$setOnInsert": {"topic": topic, "discord_id": discord_id}},
+                        upsert=True,
+                    )
+                    for discord_id in added
+                ],
+                ordered=False,
+            )
+        self._topics[topic] = set(discord_ids)
+
+    async def import_csv(self, topic: str, path: str) -> None:
+        """Import a legacy one-id-per-row CSV file into an empty topic.
+
+        The file is renamed afterwards, so a topic that drains later is not
+        filled with the legacy subscribers again."""
+        if not os.path.exists(path):
+            return
+        if not await self.members(topic):
+            discord_ids = await asyncio.to_thread(_read_csv_ids, path)
+            await self.replace(topic, discord_ids)
+            self.logger.info(
+                "Imported %d %s subscriptions from %s", len(discord_ids), topic, path
+            )
+        os.replace(path, f"{path}.imported")
@@ -35,7 +35,7 @@ async def set_ticket_status(
     user = embed.fields[2].value
     ticket_collection = bot.database["destiny_tickets"]
     ticket_id = int(embed.fields[0].value)
-    ticket_entry: dict = ticket_collection.find_one({"ticket_id": ticket_id})
+    ticket_entry: dict = await ticket_collection.find_one({"ticket_id": ticket_id})
     user_id: int = ticket_entry["discord_id"]
     user = bot.get_user(user_id)
     await user.send(
@@ -44,10 +44,10 @@ async def set_ticket_status(
     return embed
 
 
-def get_ticket_entry(bot: Ehrenbot, logger: Logger, ticket_id: int) -> dict:
+async def get_ticket_entry(bot: Ehrenbot, logger: Logger, ticket_id: int) -> dict:
     try:
         ticket_collection = bot.database["destiny_tickets"]
-        ticket_entry: dict = ticket_collection.find_one({"ticket_id": ticket_id})
+        ticket_entry: dict = await ticket_collection.find_one({"ticket_id": ticket_id})
         if ticket_entry is None:
             raise TicketNotFound
         return ticket_entry
@@ -64,7 +64,7 @@ async def sync_ticket(
     ticket_id: int,
     embed: discord.Embed,
 ) -> None:
-    ticket_entry = get_ticket_entry(bot, logger, ticket_id)
+    ticket_entry = await get_ticket_entry(bot, logger, ticket_id)
     if ticket_entry is None:
         await interaction.followup.send(
             "Ticket not found, please contact admin.", ephemeral=True, delete_after=5
@@ -85,6 +85,6 @@ async def sync_ticket(
             ticket["status"] = field.value
         if field.name == "Edit":
             ticket["edit"] = field.value
-    bot.database["destiny_tickets"].update_one(
+    await bot.database["destiny_tickets"].update_one(
         {"ticket_id": ticket_id}, {"$set": {"ticket": ticket}}
     )
@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+import logging
+import time
+
+from pymongo import UpdateOne
+
+# OAuth error of a refresh token that expired or was revoked
+INVALID_GRANT = "invalid_grant"
+
+
+def token_expires_at(token: dict, issued_at: float = None) -> float:
+    """Return the unix timestamp at which an OAuth access token expires."""
+    if issued_at is None:
+        issued_at = time.time()
+    return issued_at + token.get("expires_in", 0)
+
+
+class TokenRefreshScheduler:
+    """Refreshes stored Bungie OAuth tokens shortly before they expire.
+
+    Due times are kept in a min-heap of ``(due, discord_id)`` entries. Entries
+    that were superseded by a newer schedule for the same user are skipped
+    when popped instead of being removed from the heap.
+    """
+
+    def __init__(
+        self,
+        bot,
+        logger: logging.Logger,
+        lead_time: int,
+        concurrency: int,
+        retry_delay: int = 300,
+    ) -> None:
+        self.bot = bot
+        self.logger = logger
+        self.lead_time = lead_time
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+        self._loaded = False
+
+    async def load(self) -> None:
+        """Schedule every stored token. Tokens without expiry are due now."""
+        token_collection = self.bot.database["destiny_tokens"]
+        async for entry in token_collection.find(
+            {}, {"discord_id": 1, "expires_at": 1}
+        ):
+            self.schedule(entry["discord_id"], entry.get("expires_at", 0))
+        self._loaded = True
+        self.logger.debug("Scheduled %d tokens for refresh", len(self._due))
+
+    def schedule(self, discord_id: int, expires_at: float) -> None:
+        due = expires_at - self.lead_time
+        self._due[discord_id] = due
+        heapq.heappush(self._heap, (due, discord_id))
+
+    def unschedule(self, discord_id: int) -> None:
+        self._due.pop(discord_id, None)
+
+    def next_due(self) -> float:
+        """Return the next due time, or ``None`` if nothing is scheduled."""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[int]:
+        due_ids = []
+        while (due := self.next_due()) is not None and due <= now:
+            _, discord_id = heapq.heappop(self._heap)
+            del self._due[discord_id]
+            due_ids.append(discord_id)
+        return due_ids
+
+    async def refresh_due(self) -> int:
+        """Refresh all tokens that are due and write them in one bulk write."""
+        if not self._loaded:
+            await self.load()
+        due_ids = self.pop_due(time.time())
+        if not due_ids:
+            return 0
+
+        token_collection = self.bot.database["destiny_tokens"]
+        entries = await token_collection.find(
+            {"discord_id": {"$in": due_ids}}
+        ).to_list()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(entry: dict) -> tuple[dict, dict]:
+            async with semaphore:
+                return entry, await self.bot.destiny_client.oauth.refresh_token(
+                    entry["token"]
+                )
+
+        results = await asyncio.gather(*(refresh(entry) for entry in entries))
+        requests = []
+        for entry, new_token in results:
+            if new_token and new_token.get("error") == INVALID_GRANT:
+                # The refresh token expired or was revoked, only a new
+                # registration helps
+                self.logger.warning(
+                    "Refresh token for %s was rejected", entry["discord_id"]
+                )
+                continue
+            if not new_token or "access_token" not in new_token:
+                # Transient failure, try again after the retry delay
+                self.schedule(
+                    entry["discord_id"], time.time() + self.lead_time + self.retry_delay
+                )
+                self.logger.warning(
+                    "Could not refresh token for %s: %s", entry["discord_id"], new_token
+                )
+                continue
+            if new_token.get("membership_id") != entry["membership_id"]:
+                self.logger.warning(
+                    "Token for <membership_id> %s is invalid", entry["membership_id"]
+                )
+                continue
+            expires_at = token_expires_at(new_token)
+            requests.append(
+                UpdateOne(
+                    {"discord_id": entry["discord_id"]},
+                    {"$set": {"token": new_token, "expires_at": expires_at}},
+                )
+            )
+            self.schedule(entry["discord_id"], expires_at)
+            if entry["discord_id"] == self.bot.service_account.discord_id:
+                self.bot.service_account.update_token(new_token)
+            self.logger.debug("Updated token for %s", entry["discord_id"])
+        if requests:
+            await token_collection.bulk_write(requests, ordered=False)
+        self.logger.info("Refreshed %d of %d due tokens.", len(requests), len(entries))
+        return len(requests)
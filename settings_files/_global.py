@@ -14,6 +14,13 @@ BUNGIE_API_KEY = os.getenv("BUNGIE_API_KEY")
 BUNGIE_CLIENT_ID = os.getenv("BUNGIE_CLIENT_ID")
 BUNGIE_CLIENT_SECRET = os.getenv("BUNGIE_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("REDIRECT_URL")
+# Requests per second and burst size shared by all Bungie API calls
+BUNGIE_RATE_LIMIT = float(os.getenv("BUNGIE_RATE_LIMIT", "20"))
+BUNGIE_RATE_BURST = int(os.getenv("BUNGIE_RATE_BURST", "25"))
+BUNGIE_MAX_RETRIES = int(os.getenv("BUNGIE_MAX_RETRIES", "3"))
+BUNGIE_MAINTENANCE_PROBE_INTERVAL = int(
+    os.getenv("BUNGIE_MAINTENANCE_PROBE_INTERVAL", "300")
+)
 
 # Mongo configuration
 MONGODB_PREFIX = os.getenv("MONGODB_PREFIX")
@@ -21,6 +28,40 @@ MONGODB_USER = os.getenv("MONGODB_USER")
 MONGODB_PASS = os.getenv("MONGODB_PASS")
 MONGODB_HOST = os.getenv("MONGODB_HOST")
 MONGODB_OPTIONS = os.getenv("MONGODB_OPTIONS")
+# Threads running blocking MongoDB calls off the event loop
+MONGODB_WORKERS = int(os.getenv("MONGODB_WORKERS", "8"))
+# Commands slower than this are logged as slow queries
+MONGODB_SLOW_QUERY_MS = int(os.getenv("MONGODB_SLOW_QUERY_MS", "100"))
+
+# Registration configuration
+OAUTH_TIMEOUT = int(os.getenv("OAUTH_TIMEOUT", "300"))
+# Seconds after which unused OAuth states are removed by a TTL index
+OAUTH_STATE_TTL = int(os.getenv("OAUTH_STATE_TTL", "900"))
+# Poll interval for multi-process setups where the callback may hit another process
+OAUTH_POLL_INTERVAL = int(os.getenv("OAUTH_POLL_INTERVAL", "0"))
+
+# Scheduler configuration
+TOKEN_REFRESH_LEAD_TIME = int(os.getenv("TOKEN_REFRESH_LEAD_TIME", "300"))
+TOKEN_REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "5"))
+PROFILE_REFRESH_CONCURRENCY = int(os.getenv("PROFILE_REFRESH_CONCURRENCY", "5"))
+PROFILE_REFRESH_BATCH_SIZE = int(os.getenv("PROFILE_REFRESH_BATCH_SIZE", "50"))
+# Subscribed channels updated at the same time by notification cogs
+CHANNEL_FANOUT_CONCURRENCY = int(os.getenv("CHANNEL_FANOUT_CONCURRENCY", "5"))
+
+# Pokemon GO configuration
+# Minutes before the start and end of Pokemon GO events to post reminders at
+POGO_EVENT_START_REMINDERS = [
+    int(minutes)
+    for minutes in os.getenv("POGO_EVENT_START_REMINDERS", "30").split(",")
+    if minutes
+]
+POGO_EVENT_END_REMINDERS = [
+    int(minutes)
+    for minutes in os.getenv("POGO_EVENT_END_REMINDERS", "").split(",")
+    if minutes
+]
+# Days of PokeBattler archive pages checked for articles, including today
+POKEBATTLER_BACKFILL_DAYS = int(os.getenv("POKEBATTLER_BACKFILL_DAYS", "3"))
 
 # Permissions
 MODERATOR_ROLE = "Ehrenmänner und Ender"